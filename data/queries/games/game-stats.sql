@@ -0,0 +1,17 @@
+-- Play count, last played date and wins by player for one game.
+-- Reads the game_stats tables kept up to date by migration 0003.
+-- wins is a JSON object with every player who has won any game (0 if not this one), most wins overall first.
+SELECT
+    game_stats.id,
+    bgg.name,
+    notes.status,
+    game_stats.plays AS games,
+    game_stats.lastPlayed,
+    julianday('now') - julianday(game_stats.lastPlayed) AS daysSince,
+    (SELECT json_group_object(players.winner, COALESCE(w.wins, 0))
+     FROM (SELECT winner FROM game_winner_stats GROUP BY winner ORDER BY SUM(wins) DESC, winner) AS players
+     LEFT JOIN game_winner_stats w ON w.id = game_stats.id AND w.winner = players.winner) AS wins
+FROM game_stats
+LEFT JOIN bgg ON bgg.id = game_stats.id
+LEFT JOIN notes ON notes.id = game_stats.id
+WHERE game_stats.id = :id
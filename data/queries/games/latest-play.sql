@@ -0,0 +1,2 @@
+-- The rowid of the newest play (0 when the log is empty).
+SELECT COALESCE(MAX(rowid), 0) AS rowid FROM log
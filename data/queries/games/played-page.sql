@@ -0,0 +1,10 @@
+-- One page of plays, newest first, continuing after a cursor.
+-- Pass the date, id and rowid of the last row of the previous page;
+-- for the first page pass date '9999-12-31' and id 0, rowid 0.
+SELECT log.rowid AS rowid, log.date, log.id, bgg.name, log.winner, log.scores, log.comment
+FROM log
+LEFT JOIN bgg ON bgg.id = log.id
+WHERE log.date <= :date
+  AND (log.date < :date OR log.id > :id OR (log.id = :id AND log.rowid > :rowid))
+ORDER BY log.date DESC, log.id ASC, log.rowid ASC
+LIMIT :limit
@@ -0,0 +1,8 @@
+-- Plays recorded after a given log rowid, oldest first.
+-- Pass the highest rowid already seen; use games/latest-play to find it.
+SELECT log.rowid AS rowid, log.date, log.id, bgg.name, log.winner, log.scores, log.comment
+FROM log
+LEFT JOIN bgg ON bgg.id = log.id
+WHERE log.rowid > :rowid
+ORDER BY log.rowid ASC
+LIMIT :limit
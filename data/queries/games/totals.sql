@@ -0,0 +1,7 @@
+-- Plays and wins by player across all games.
+-- wins is a JSON object keyed by winner (draws included), most wins first.
+SELECT
+    COALESCE((SELECT SUM(plays) FROM game_stats), 0) AS Games,
+    (SELECT json_group_object(winner, wins)
+     FROM (SELECT winner, SUM(wins) AS wins FROM game_winner_stats GROUP BY winner ORDER BY wins DESC, winner))
+        AS wins
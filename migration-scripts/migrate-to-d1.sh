@@ -66,8 +66,13 @@ if [ -f "migrations/data/saved_queries.sql" ]; then
     wrangler d1 execute games --remote --file=migrations/data/saved_queries.sql
 fi
 
-# Step 5: Verify migration
-echo "✅ Step 5: Verifying migration..."
+# Step 5: Build the play summary from the imported log
+echo "📊 Step 5: Building per-game play summary and play indexes..."
+wrangler d1 execute games --remote --file=migrations/0003_game_stats.sql
+wrangler d1 execute games --remote --file=migrations/0004_play_uniqueness.sql
+
+# Step 6: Verify migration
+echo "✅ Step 6: Verifying migration..."
 echo "Checking table counts:"
 
 wrangler d1 execute games --remote --command="SELECT 'bgg' as table_name, COUNT(*) as count FROM bgg 
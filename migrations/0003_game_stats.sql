@@ -0,0 +1,134 @@
+-- Per-game play summary maintained by triggers on log
+-- The list and stats views read from these tables instead of aggregating
+-- the whole log on every request. Plays without a game id are not counted.
+
+-- Play count and most recent play date per game
+CREATE TABLE IF NOT EXISTS "game_stats" (
+   [id] INTEGER PRIMARY KEY,
+   [plays] INTEGER NOT NULL DEFAULT 0,
+   [lastPlayed] TEXT
+);
+
+-- Wins per game and winner value ('Andrew', 'Trish', 'Draw', ...)
+CREATE TABLE IF NOT EXISTS "game_winner_stats" (
+   [id] INTEGER NOT NULL,
+   [winner] TEXT NOT NULL,
+   [wins] INTEGER NOT NULL DEFAULT 0,
+   PRIMARY KEY (id, winner)
+);
+
+-- Backfill from the existing log
+DELETE FROM game_stats;
+INSERT INTO game_stats (id, plays, lastPlayed)
+SELECT id, COUNT(*), MAX(date) FROM log WHERE id IS NOT NULL GROUP BY id;
+
+DELETE FROM game_winner_stats;
+INSERT INTO game_winner_stats (id, winner, wins)
+SELECT id, winner, COUNT(*) FROM log WHERE id IS NOT NULL AND winner IS NOT NULL GROUP BY id, winner;
+
+-- Keep the summary current
+CREATE TRIGGER IF NOT EXISTS log_stats_insert AFTER INSERT ON log
+WHEN NEW.id IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO game_stats (id, plays, lastPlayed) VALUES (NEW.id, 0, NULL);
+    UPDATE game_stats SET
+        plays = plays + 1,
+        lastPlayed = CASE WHEN lastPlayed IS NULL OR NEW.date > lastPlayed THEN NEW.date ELSE lastPlayed END
+    WHERE id = NEW.id;
+    INSERT OR IGNORE INTO game_winner_stats (id, winner, wins)
+    SELECT NEW.id, NEW.winner, 0 WHERE NEW.winner IS NOT NULL;
+    UPDATE game_winner_stats SET wins = wins + 1 WHERE id = NEW.id AND winner = NEW.winner;
+END;
+
+CREATE TRIGGER IF NOT EXISTS log_stats_delete AFTER DELETE ON log
+WHEN OLD.id IS NOT NULL
+BEGIN
+    UPDATE game_stats SET
+        plays = plays - 1,
+        lastPlayed = CASE WHEN OLD.date = lastPlayed
+                          THEN (SELECT MAX(date) FROM log WHERE id = OLD.id)
+                          ELSE lastPlayed END
+    WHERE id = OLD.id;
+    DELETE FROM game_stats WHERE id = OLD.id AND plays <= 0;
+    UPDATE game_winner_stats SET wins = wins - 1 WHERE id = OLD.id AND winner = OLD.winner;
+    DELETE FROM game_winner_stats WHERE id = OLD.id AND winner = OLD.winner AND wins <= 0;
+END;
+
+-- An update is a delete of the old row followed by an insert of the new one
+CREATE TRIGGER IF NOT EXISTS log_stats_update AFTER UPDATE OF date, id, winner ON log
+BEGIN
+    UPDATE game_stats SET
+        plays = plays - 1,
+        lastPlayed = CASE WHEN OLD.date = lastPlayed
+                          THEN (SELECT MAX(date) FROM log WHERE id = OLD.id)
+                          ELSE lastPlayed END
+    WHERE id = OLD.id;
+    DELETE FROM game_stats WHERE id = OLD.id AND plays <= 0;
+    UPDATE game_winner_stats SET wins = wins - 1 WHERE id = OLD.id AND winner = OLD.winner;
+    DELETE FROM game_winner_stats WHERE id = OLD.id AND winner = OLD.winner AND wins <= 0;
+
+    INSERT OR IGNORE INTO game_stats (id, plays, lastPlayed)
+    SELECT NEW.id, 0, NULL WHERE NEW.id IS NOT NULL;
+    UPDATE game_stats SET
+        plays = plays + 1,
+        lastPlayed = CASE WHEN lastPlayed IS NULL OR NEW.date > lastPlayed THEN NEW.date ELSE lastPlayed END
+    WHERE id = NEW.id;
+    INSERT OR IGNORE INTO game_winner_stats (id, winner, wins)
+    SELECT NEW.id, NEW.winner, 0 WHERE NEW.id IS NOT NULL AND NEW.winner IS NOT NULL;
+    UPDATE game_winner_stats SET wins = wins + 1 WHERE id = NEW.id AND winner = NEW.winner;
+END;
+
+-- Rewrite the aggregate views over the summary tables
+
+DROP VIEW IF EXISTS game_list2;
+CREATE VIEW game_list2 AS
+SELECT
+    bgg.name,
+    bgg.id,
+    notes.status,
+    bgg.complexity,
+    bgg.ranking,
+    COALESCE(game_stats.plays, 0) AS games,
+    game_stats.lastPlayed,
+    notes.uri
+FROM bgg
+LEFT JOIN notes ON bgg.id = notes.id
+LEFT JOIN game_stats ON bgg.id = game_stats.id
+ORDER BY bgg.name;
+
+DROP VIEW IF EXISTS wins;
+CREATE VIEW wins AS
+SELECT
+    bgg.name,
+    game_winner_stats.id,
+    game_winner_stats.winner,
+    game_winner_stats.wins
+FROM game_winner_stats
+LEFT JOIN bgg ON game_winner_stats.id = bgg.id;
+
+DROP VIEW IF EXISTS winner;
+CREATE VIEW winner AS
+SELECT
+    bgg.name,
+    game_stats.id,
+    game_stats.plays AS Games,
+    COALESCE((SELECT wins FROM game_winner_stats w WHERE w.id = game_stats.id AND w.winner = 'Andrew'), 0) AS Andrew,
+    COALESCE((SELECT wins FROM game_winner_stats w WHERE w.id = game_stats.id AND w.winner = 'Trish'), 0) AS Trish,
+    COALESCE((SELECT wins FROM game_winner_stats w WHERE w.id = game_stats.id AND w.winner = 'Draw'), 0) AS Draw
+FROM game_stats
+LEFT JOIN bgg ON game_stats.id = bgg.id
+ORDER BY bgg.name ASC;
+
+DROP VIEW IF EXISTS last_played;
+CREATE VIEW last_played AS
+SELECT
+    game_stats.lastPlayed,
+    julianday('now') - julianday(game_stats.lastPlayed) AS daysSince,
+    game_stats.plays AS games,
+    game_stats.id,
+    bgg.name
+FROM game_stats
+LEFT JOIN bgg ON game_stats.id = bgg.id
+LEFT JOIN notes ON game_stats.id = notes.id
+WHERE notes.status = 'Playing'
+ORDER BY game_stats.lastPlayed DESC;
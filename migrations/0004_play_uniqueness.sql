@@ -0,0 +1,60 @@
+-- Enforce unique plays at write time and index the log for keyset paging
+-- With duplicates rejected on insert, the played view no longer needs a
+-- DISTINCT over the whole log, and recent plays can be read straight off
+-- the (date DESC, id) index a page at a time (see data/queries/games/played-page.sql).
+--
+-- Existing duplicate plays are DELETED from log. Every deleted row is first
+-- copied to log_duplicates (with its original rowid) so it can be reviewed
+-- or restored; drop that table once it has been checked.
+
+-- Missing values compare as empty, in the dedupe and the index alike: a
+-- unique index treats NULLs as distinct, so without IFNULL two copies of a
+-- play with no game id (or no date, or no winner) would both be accepted.
+
+-- Rows removed as duplicates
+CREATE TABLE IF NOT EXISTS "log_duplicates" (
+   [log_rowid] INTEGER PRIMARY KEY,
+   [date] TEXT,
+   [id] INTEGER,
+   [winner] TEXT,
+   [scores] TEXT,
+   [comment] TEXT
+);
+
+INSERT OR IGNORE INTO log_duplicates (log_rowid, date, id, winner, scores, comment)
+SELECT rowid, date, id, winner, scores, comment
+FROM log
+WHERE rowid NOT IN (
+    SELECT MIN(rowid)
+    FROM log
+    GROUP BY IFNULL(date, ''), IFNULL(id, ''), IFNULL(winner, ''), IFNULL(scores, ''), IFNULL(comment, '')
+);
+
+-- Remove existing duplicates, keeping the first copy (the game_stats triggers adjust the summary)
+DELETE FROM log
+WHERE rowid NOT IN (
+    SELECT MIN(rowid)
+    FROM log
+    GROUP BY IFNULL(date, ''), IFNULL(id, ''), IFNULL(winner, ''), IFNULL(scores, ''), IFNULL(comment, '')
+);
+
+-- A play is unique on all of its columns
+CREATE UNIQUE INDEX IF NOT EXISTS idx_log_unique
+ON log(IFNULL(date, ''), IFNULL(id, ''), IFNULL(winner, ''), IFNULL(scores, ''), IFNULL(comment, ''));
+
+-- Covers the played ordering and the keyset cursor (date, id, rowid); replaces idx_log_date
+CREATE INDEX IF NOT EXISTS idx_log_date_id ON log(date DESC, id);
+DROP INDEX IF EXISTS idx_log_date;
+
+DROP VIEW IF EXISTS played;
+CREATE VIEW played AS
+SELECT
+    log.date,
+    log.id,
+    bgg.name,
+    log.winner,
+    log.scores,
+    log.comment
+FROM log
+LEFT JOIN bgg ON bgg.id = log.id
+ORDER BY log.date DESC, log.id;
@@ -3,21 +3,110 @@ REST API client for Eurogames database.
 Replaces direct SQLite database access with HTTP API calls.
 """
 
-import requests
 import os
+import contextvars
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple, Union
 from urllib.parse import urljoin
 
-# Configure logging
+import archive
+import queries
+from queries import Params
+from scheduler import RequestScheduler, current_priority, request_priority
+from shared_cache import SharedCache
+from tracing import tracer, trace_headers
+from transport import TransportError, transport_from_env
+from warm_start import WarmStartStore
+
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+
+DEFAULT_API_URL = 'https://eurogames.web-c10.workers.dev'
+
+# Query results and game details kept in-process when no shared cache is configured
+QUERY_CACHE_SIZE = 128
+GAME_DETAILS_CACHE_SIZE = 512
+
+# Concurrent requests made by one get_games_details() call
+BULK_FETCH_WORKERS = 8
+
+# Datasets kept in the warm-start snapshot: the games list, plays and stats
+WARM_ENDPOINTS = ('/v1/games', '/v1/plays')
+WARM_PREFIXES = ('/v1/stats/',)
+
+
+def is_warmable(endpoint: str) -> bool:
+    """Whether responses from an endpoint are kept in the warm-start snapshot."""
+    return endpoint in WARM_ENDPOINTS or endpoint.startswith(WARM_PREFIXES)
+
+
+def unwrap_list(response: Any, key: str) -> List[Dict[str, Any]]:
+    """
+    Extract a list of records from an API response.
+
+    Args:
+        response: Parsed JSON response
+        key: Key holding the list in legacy unwrapped responses
+
+    Returns:
+        List of records, or an empty list if none are present
+    """
+    # API returns wrapped format: {"data": [...], "meta": {...}}
+    if isinstance(response, dict) and 'data' in response:
+        return response['data'] if isinstance(response['data'], list) else []
+    # Fallback for unwrapped responses
+    return response if isinstance(response, list) else response.get(key, [])
+
+
+def unwrap_game(response: Any) -> Optional[Dict[str, Any]]:
+    """Extract a single game record from a game details response."""
+    # API might return wrapped format: {"data": {...}, "meta": {...}} or direct object
+    if isinstance(response, dict) and 'data' in response:
+        data = response['data']
+        return data if isinstance(data, dict) else None
+    if isinstance(response, dict) and 'game' in response:
+        return response['game']
+    return response if isinstance(response, dict) and response else None
+
+
+def unwrap_totals(response: Any) -> Dict[str, Any]:
+    """Extract the totals record from a totals response."""
+    # API returns wrapped format: {"data": {...}, "meta": {...}}
+    if isinstance(response, dict) and 'data' in response:
+        data = response['data']
+        # data could be a single dict or list with one dict
+        if isinstance(data, list) and len(data) > 0:
+            return data[0] if isinstance(data[0], dict) else {}
+        return data if isinstance(data, dict) else {}
+    # Fallback for unwrapped responses
+    if isinstance(response, list) and len(response) > 0:
+        return response[0]
+    return response if isinstance(response, dict) else {}
+
+
+def result_payload(date: str, game_id: int, winner: str, scores: Optional[str],
+                    comment: Optional[str]) -> Dict[str, Any]:
+    """Build the request body for recording a game result, omitting unset fields."""
+    data = {
+        'date': date,
+        'game_id': game_id,
+        'winner': winner,
+        'scores': scores,
+        'comment': comment
+    }
+    # Remove None values
+    return {k: v for k, v in data.items() if v is not None}
 
 
 class EurogamesAPIClient:
     """Client for interacting with the Eurogames REST API."""
 
-    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: int = 10):
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: int = 10,
+                 cache: Optional[SharedCache] = None, warm_start: Optional[str] = None, transport=None,
+                 scheduler: Optional[RequestScheduler] = None):
         """
         Initialize the API client.
 
@@ -25,18 +114,37 @@ class EurogamesAPIClient:
             base_url: Base URL of the API (default from EUROGAMES_API_URL env var)
             api_key: API key for authentication (default from EUROGAMES_API_KEY env var)
             timeout: Request timeout in seconds
+            cache: Shared response cache (default: a SharedCache at EUROGAMES_CACHE_DB, if set)
+            warm_start: Warm-start snapshot file (default from EUROGAMES_WARM_START env var, if set)
+            transport: HTTP transport (default from EUROGAMES_TRANSPORT env var: live, record or replay)
+            scheduler: Request scheduler (default: rate limited to EUROGAMES_API_RATE requests per second, if set)
         """
-        self.base_url = base_url or os.environ.get(
-            'EUROGAMES_API_URL',
-            'https://eurogames.web-c10.workers.dev'
-        )
+        self.base_url = base_url or os.environ.get('EUROGAMES_API_URL', DEFAULT_API_URL)
         self.api_key = api_key or os.environ.get('EUROGAMES_API_KEY')
         self.timeout = timeout
+        self.transport = transport or transport_from_env()
+        self.scheduler = scheduler or RequestScheduler(rate=float(os.environ.get('EUROGAMES_API_RATE', 0)))
+        if cache is None and os.environ.get('EUROGAMES_CACHE_DB'):
+            cache = SharedCache(os.environ['EUROGAMES_CACHE_DB'])
+        self.cache = cache
+        self._named_queries: Optional[Dict[str, str]] = None
+        self._query_results: OrderedDict = OrderedDict()
+        self._game_details: OrderedDict = OrderedDict()
+        # Guards both in-process caches, which bulk fetches and request threads share
+        self._local_lock = threading.Lock()
+        self._local_version = 0
+        # Called with each play recorded through add_game_result, e.g. to update ratings
+        self.result_listeners: List[Callable[[Dict[str, Any]], None]] = []
         # Remove trailing slash for consistent URL building
         self.base_url = self.base_url.rstrip('/')
 
+        warm_start = warm_start or os.environ.get('EUROGAMES_WARM_START')
+        self.warm_start = WarmStartStore(warm_start, self._warm_start_stamp) if warm_start else None
+        if self.warm_start is not None:
+            self.warm_start.start()
+
         # Log initialization
-        logger.debug(f"API Client initialized - URL: {self.base_url}, API Key configured: {bool(self.api_key)}")
+        logger.debug("API Client initialized - URL: %s, API Key configured: %s", self.base_url, bool(self.api_key))
 
     def _get_auth_header(self) -> Dict[str, str]:
         """
@@ -51,58 +159,144 @@ class EurogamesAPIClient:
         # Bearer token authentication
         return {'Authorization': f'Bearer {self.api_key}'}
 
-    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    def _warm_start_stamp(self) -> Dict[str, Any]:
+        """Version stamp a warm-start snapshot must match to be used (shared with the async client)."""
+        return {'base_url': self.base_url}
+
+    def _warm_start_version(self, version: int) -> Optional[int]:
+        """
+        Data version to keep with warm-start entries.
+
+        Only the shared cache's version survives a restart; the in-process counter
+        starts again at 0, so without a cache entries carry no version (as in the
+        async client) and writes are covered by clearing the snapshot instead.
+        """
+        return version if self.cache is not None else None
+
+    def _record_warm_start(self, key: str, data: Any, version: int) -> None:
+        """Record a response in the warm-start snapshot unless a write has happened since it was requested."""
+        if self.cache is not None:
+            self.warm_start.record(key, data, version)
+            return
+        # Under the lock, so add_game_result's bump and clear() come either before the check or after the record
+        with self._local_lock:
+            if version == self._local_version:
+                self.warm_start.record(key, data)
+
+    def _revalidate(self, endpoint: str, params: Optional[Dict[str, Any]], key: str) -> None:
+        """Refetch a request served from the warm-start snapshot, in the background."""
+        if not self.warm_start.claim_revalidation(key):
+            return
+
+        def refetch():
+            try:
+                with request_priority('background'):
+                    self._get(endpoint, params, allow_stale=False)
+            except APIError as e:
+                logger.warning("Revalidating %s failed: %s", endpoint, e)
+            finally:
+                self.warm_start.release_revalidation(key)
+
+        threading.Thread(target=refetch, name='warm-start-revalidate', daemon=True).start()
+
+    def _cache_key(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        return urljoin(self.base_url + '/', endpoint.lstrip('/')) + '?' + json.dumps(params, sort_keys=True)
+
+    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, allow_stale: bool = True) -> Any:
         """
         Make a GET request to the API.
 
         Args:
             endpoint: API endpoint path (e.g., '/games')
             params: Query parameters
+            allow_stale: Serve warm-start snapshot data not yet refetched since startup
 
         Returns:
             Parsed JSON response
 
         Raises:
-            requests.RequestException: If the request fails
+            APIError: If the request fails
         """
         url = urljoin(self.base_url + '/', endpoint.lstrip('/'))
         headers = self._get_auth_header()
 
-        logger.debug(f"GET request - URL: {url}, Params: {params}, Auth header present: {bool(headers.get('Authorization'))}")
-
-        try:
-            response = requests.get(url, params=params, headers=headers, timeout=self.timeout)
-            logger.debug(f"Response status: {response.status_code}")
-            response.raise_for_status()
-            data = response.json()
-            logger.debug(f"Response data type: {type(data)}, length: {len(data) if isinstance(data, (list, dict)) else 'N/A'}")
-            return data
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {str(e)}")
-            raise APIError(f"API request failed: {str(e)}") from e
-
-    def _post(self, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        cache_key = self._cache_key(endpoint, params)
+        warm = self.warm_start is not None and is_warmable(endpoint)
+
+        with tracer.span(f"GET {endpoint}", **{'http.url': url}) as span:
+            # Read before fetching, so data that races a write is stored under the older version
+            version = self.data_version()
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                span.set('cache.hit', cached is not None)
+                if cached is not None:
+                    logger.debug("Cache hit - URL: %s, Params: %s", url, params)
+                    return cached
+
+            if warm and allow_stale:
+                stale = self.warm_start.stale(cache_key, self._warm_start_version(version))
+                if stale is not None:
+                    span.set('cache.stale', True)
+                    logger.debug("Serving warm-start data while revalidating - URL: %s, Params: %s", url, params)
+                    self._revalidate(endpoint, params, cache_key)
+                    return stale
+
+            logger.debug("GET request - URL: %s, Params: %s, Auth header present: %s", url, params,
+                         'Authorization' in headers)
+
+            try:
+                with self.scheduler.slot(current_priority('interactive')) as waited:
+                    span.set('queue.wait_ms', round(waited * 1000, 2))
+                    response = self.transport.request('GET', url, params=params,
+                                                      headers={**headers, **trace_headers()}, timeout=self.timeout)
+                logger.debug("Response status: %s", response.status_code)
+                span.set('http.status_code', response.status_code)
+                span.set('http.response_bytes', len(response.content))
+                response.raise_for_status()
+                with tracer.span('json.decode'):
+                    data = response.json()
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Response data type: %s, length: %s", type(data).__name__,
+                                 len(data) if isinstance(data, (list, dict)) else 'N/A')
+                if self.cache is not None:
+                    self.cache.set(cache_key, data, version)
+                if warm:
+                    self._record_warm_start(cache_key, data, version)
+                return data
+            except TransportError as e:
+                logger.error("API request failed: %s", e)
+                raise APIError(f"API request failed: {str(e)}", status_code=e.status_code) from e
+
+    def _post(self, endpoint: str, data: Optional[Dict[str, Any]] = None, priority: Optional[str] = None) -> Any:
         """
         Make a POST request to the API.
 
         Args:
             endpoint: API endpoint path
             data: Request body data
+            priority: Scheduling class (default: the current request_priority(), else 'write')
 
         Returns:
             Parsed JSON response
 
         Raises:
-            requests.RequestException: If the request fails
+            APIError: If the request fails
         """
         url = urljoin(self.base_url + '/', endpoint.lstrip('/'))
         headers = self._get_auth_header()
-        try:
-            response = requests.post(url, json=data, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise APIError(f"API request failed: {str(e)}") from e
+        with tracer.span(f"POST {endpoint}", **{'http.url': url}) as span:
+            try:
+                with self.scheduler.slot(priority or current_priority('write')) as waited:
+                    span.set('queue.wait_ms', round(waited * 1000, 2))
+                    response = self.transport.request('POST', url, json_body=data,
+                                                      headers={**headers, **trace_headers()}, timeout=self.timeout)
+                span.set('http.status_code', response.status_code)
+                span.set('http.response_bytes', len(response.content))
+                response.raise_for_status()
+                with tracer.span('json.decode'):
+                    return response.json()
+            except TransportError as e:
+                raise APIError(f"API request failed: {str(e)}", status_code=e.status_code) from e
 
     def get_games_list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """
@@ -117,12 +311,7 @@ class EurogamesAPIClient:
         # Build params - only include status if specified
         params = {'status': status} if status is not None else None
         response = self._get('/v1/games', params=params)
-
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        # Fallback for unwrapped responses
-        return response if isinstance(response, list) else response.get('games', [])
+        return unwrap_list(response, 'games')
 
     def get_all_games(self) -> List[Dict[str, Any]]:
         """
@@ -132,11 +321,7 @@ class EurogamesAPIClient:
             List of all games
         """
         response = self._get('/v1/games')
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        # Fallback for unwrapped responses
-        return response if isinstance(response, list) else response.get('games', [])
+        return unwrap_list(response, 'games')
 
     def get_game_details(self, game_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -148,14 +333,75 @@ class EurogamesAPIClient:
         Returns:
             Game details dictionary with bgg and notes data
         """
-        response = self._get(f'/v1/games/{game_id}')
-        # API might return wrapped format: {"data": {...}, "meta": {...}} or direct object
-        if isinstance(response, dict) and 'data' in response:
-            data = response['data']
-            return data if isinstance(data, dict) else None
-        if isinstance(response, dict) and 'game' in response:
-            return response['game']
-        return response if isinstance(response, dict) and response else None
+        if self.cache is None:
+            with self._local_lock:
+                version = self._local_version
+                entry = self._game_details.get(str(game_id))
+                if entry is not None and entry[0] == version:
+                    self._game_details.move_to_end(str(game_id))
+                    return entry[1]
+        game = unwrap_game(self._get(f'/v1/games/{game_id}'))
+        if self.cache is None and game is not None:
+            with self._local_lock:
+                self._game_details[str(game_id)] = (version, game)
+                while len(self._game_details) > GAME_DETAILS_CACHE_SIZE:
+                    self._game_details.popitem(last=False)
+        return game
+
+    def _cached_game_details(self, game_id: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """Game details already in the shared or in-process cache, without a request."""
+        if self.cache is not None:
+            response = self.cache.get(self._cache_key(f'/v1/games/{game_id}'))
+            return unwrap_game(response) if response is not None else None
+        with self._local_lock:
+            entry = self._game_details.get(str(game_id))
+            return entry[1] if entry is not None and entry[0] == self._local_version else None
+
+    def _game_details_or_none(self, game_id: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """get_game_details(), with None for a game the API does not have."""
+        try:
+            return self.get_game_details(game_id)
+        except APIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    def get_games_details(self, game_ids: Iterable[Union[int, str]],
+                          max_workers: int = BULK_FETCH_WORKERS) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get details for many games.
+
+        Repeated ids are fetched once and cached games are not fetched at all; the
+        rest are requested concurrently, at most max_workers at a time.
+
+        Args:
+            game_ids: Game IDs, in the order the results should follow
+            max_workers: Most requests in flight at once
+
+        Returns:
+            Game details (or None if not found) for each id, in input order
+
+        Raises:
+            APIError: If any request fails (other than with 404 Not Found)
+        """
+        game_ids = list(game_ids)
+        unique = list(dict.fromkeys(str(game_id) for game_id in game_ids))
+        found = {game_id: self._cached_game_details(game_id) for game_id in unique}
+        misses = [game_id for game_id, game in found.items() if game is None]
+
+        with tracer.span('games.details', **{'games.requested': len(game_ids), 'games.unique': len(unique),
+                                              'games.fetched': len(misses)}):
+            if len(misses) == 1:
+                found[misses[0]] = self._game_details_or_none(misses[0])
+            elif misses:
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(misses)),
+                                        thread_name_prefix='games-details') as pool:
+                    # Each request runs in a copy of the caller's context, keeping its trace and priority
+                    futures = {game_id: pool.submit(contextvars.copy_context().run, self._game_details_or_none, game_id)
+                               for game_id in misses}
+                    for game_id, future in futures.items():
+                        found[game_id] = future.result()
+        return [found[str(game_id)] for game_id in game_ids]
 
     def get_game_history(self, game_id: int) -> List[Dict[str, Any]]:
         """
@@ -168,10 +414,7 @@ class EurogamesAPIClient:
             List of play records for this game
         """
         response = self._get(f'/v1/games/{game_id}/history')
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        return response if isinstance(response, list) else response.get('plays', [])
+        return unwrap_list(response, 'plays')
 
     def get_played_results(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -184,10 +427,45 @@ class EurogamesAPIClient:
             List of played games with results (up to limit)
         """
         response = self._get('/v1/plays', params={'limit': limit})
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        return response if isinstance(response, list) else response.get('plays', [])
+        return unwrap_list(response, 'plays')
+
+    def get_played_page(self, limit: int = 100,
+                        after: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Get one page of plays, newest first, using keyset pagination.
+
+        Each page is an index range scan starting at the cursor, so its cost does
+        not grow with the size of the log.
+
+        Args:
+            limit: Plays per page
+            after: Cursor returned with the previous page (None for the first page)
+
+        Returns:
+            Tuple of (plays, cursor for the next page or None when there are no more)
+        """
+        cursor = after or {'date': '9999-12-31', 'id': 0, 'rowid': 0}
+        rows = self.run_query('games/played-page', {**cursor, 'limit': limit})
+        if len(rows) < limit:
+            return rows, None
+        last = rows[-1]
+        return rows, {'date': last['date'], 'id': last['id'], 'rowid': last['rowid']}
+
+    def iter_played(self, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every play, newest first, one keyset page at a time.
+
+        Args:
+            page_size: Plays per request
+        """
+        cursor = None
+        while True:
+            # Bulk reads queue behind page loads unless the caller chose a class
+            with request_priority(current_priority('background')):
+                rows, cursor = self.get_played_page(page_size, cursor)
+            yield from rows
+            if cursor is None:
+                return
 
     def get_recent_plays(self, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -200,10 +478,7 @@ class EurogamesAPIClient:
             List of recent plays
         """
         response = self._get('/v1/stats/recent', params={'limit': limit})
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        return response if isinstance(response, list) else response.get('plays', [])
+        return unwrap_list(response, 'plays')
 
     def get_last_played(self) -> List[Dict[str, Any]]:
         """
@@ -213,10 +488,7 @@ class EurogamesAPIClient:
             List of games with last played information
         """
         response = self._get('/v1/stats/last-played')
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        return response if isinstance(response, list) else response.get('games', [])
+        return unwrap_list(response, 'games')
 
     def get_winner_stats(self) -> List[Dict[str, Any]]:
         """
@@ -226,10 +498,7 @@ class EurogamesAPIClient:
             List of games with win statistics
         """
         response = self._get('/v1/stats/winners')
-        # API returns wrapped format: {"data": [...], "meta": {...}}
-        if isinstance(response, dict) and 'data' in response:
-            return response['data'] if isinstance(response['data'], list) else []
-        return response if isinstance(response, list) else response.get('winners', [])
+        return unwrap_list(response, 'winners')
 
     def get_totals(self) -> Dict[str, Any]:
         """
@@ -239,18 +508,171 @@ class EurogamesAPIClient:
             Dictionary with total games, wins by player, and draws
         """
         response = self._get('/v1/stats/totals')
+        return unwrap_totals(response)
+
+    def export_data(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Export all tables.
+
+        Runs at background priority unless the caller has set one with request_priority().
+
+        Returns:
+            Dictionary of table name ('bgg', 'notes', 'log') to list of rows
+        """
+        with request_priority(current_priority('background')):
+            response = self._get('/v1/export')
         # API returns wrapped format: {"data": {...}, "meta": {...}}
         if isinstance(response, dict) and 'data' in response:
             data = response['data']
-            # data could be a single dict or list with one dict
-            if isinstance(data, list) and len(data) > 0:
-                return data[0] if isinstance(data[0], dict) else {}
             return data if isinstance(data, dict) else {}
-        # Fallback for unwrapped responses
-        if isinstance(response, list) and len(response) > 0:
-            return response[0]
         return response if isinstance(response, dict) else {}
 
+    def export_archive(self, path: str, chunk_rows: int = 5000) -> Dict[str, int]:
+        """
+        Export bgg, notes and log into a compressed, chunked, columnar archive.
+
+        Args:
+            path: Output archive file
+            chunk_rows: Rows per compressed chunk
+
+        Returns:
+            Number of rows written per table
+        """
+        return archive.write_archive(path, self.export_data(), chunk_rows=chunk_rows)
+
+    @staticmethod
+    def restore_archive(path: str, db_path: str, tables: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Restore tables from an archive into a local SQLite database.
+
+        Args:
+            path: Archive file written by export_archive()
+            db_path: SQLite database file
+            tables: Tables to restore, e.g. ['log'] (default: all)
+
+        Returns:
+            Number of rows restored per table
+        """
+        return archive.restore_archive(path, db_path, tables)
+
+    def list_queries(self, refresh: bool = False) -> Dict[str, str]:
+        """
+        Get the named queries: the .sql files under data/queries plus the saved_queries table.
+
+        Args:
+            refresh: Reload the files and saved queries instead of using the loaded set
+
+        Returns:
+            Dictionary of query name to SQL; a file wins over a saved query of the same name
+        """
+        if self._named_queries is None or refresh:
+            named = queries.load_query_files()
+            try:
+                for row in self.run_sql('SELECT name, sql FROM saved_queries'):
+                    named.setdefault(row['name'], row['sql'])
+            except APIError as e:
+                logger.warning("Saved queries unavailable: %s", e)
+            self._named_queries = named
+        return self._named_queries
+
+    def _named_sql(self, name: str) -> str:
+        named = self.list_queries()
+        if name not in named:
+            named = self.list_queries(refresh=True)
+        if name not in named:
+            raise queries.QueryError(f"Unknown query: {name}")
+        return named[name]
+
+    def run_query(self, name: str, params: Params = None, fresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Run a named query.
+
+        Args:
+            name: Query name, e.g. 'games/winners' or a saved_queries name
+            params: Values for the query's ':name' (mapping) or '?' (sequence) placeholders
+            fresh: Skip the result cache, e.g. to see writes made by other API clients
+
+        Returns:
+            List of result rows
+
+        Raises:
+            QueryError: If the query is unknown, not a single SELECT, or the parameters do not match
+            APIError: If the request fails
+        """
+        return self.run_sql(self._named_sql(name), params, fresh)
+
+    def run_sql(self, sql: str, params: Params = None, fresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Run an ad-hoc SELECT query, with parameters bound by the API.
+
+        Results are cached under the hash of the normalized SQL and the parameters,
+        and dropped when the data version changes. With fresh=True the cache is
+        not read, only updated.
+        """
+        return self._query(*queries.bind(sql, params), fresh=fresh)
+
+    def iter_query(self, name: str, params: Params = None, page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the rows of a named query, fetching (and caching) one page at a time.
+
+        Pages are taken with LIMIT/OFFSET, so the query needs an ORDER BY for a stable order.
+
+        Args:
+            name: Query name
+            params: Query parameters
+            page_size: Rows per request
+        """
+        sql, values = queries.bind(self._named_sql(name), params)
+        sql = queries.paged(sql)
+        offset = 0
+        while True:
+            with request_priority(current_priority('background')):
+                rows = self._query(sql, values + [page_size, offset])
+            yield from rows
+            if len(rows) < page_size:
+                return
+            offset += page_size
+
+    def data_version(self) -> int:
+        """
+        Return the current data version, which moves whenever a result is recorded.
+
+        With a shared cache it is shared by every process on the host; otherwise it
+        only counts writes made through this client.
+        """
+        return self.cache.version() if self.cache is not None else self._local_version
+
+    def _query(self, sql: str, values: List[Any], fresh: bool = False) -> List[Dict[str, Any]]:
+        """POST bound SQL to /v1/query, going through the query result cache."""
+        key = 'query:' + queries.sql_hash(sql) + ':' + json.dumps(values)
+        version = self.data_version()
+        if fresh:
+            cached = None
+        elif self.cache is not None:
+            cached = self.cache.get(key)
+        else:
+            with self._local_lock:
+                entry = self._query_results.get(key)
+                cached = entry[1] if entry is not None and entry[0] == version else None
+                if cached is not None:
+                    self._query_results.move_to_end(key)
+        if cached is not None:
+            logger.debug("Query cache hit - %s", sql)
+            return cached
+
+        # Queries are reads, so they are not scheduled as writes
+        response = self._post('/v1/query', data={'query': sql, 'params': values},
+                              priority=current_priority('interactive'))
+        rows = unwrap_list(response, 'results')
+        if self.cache is not None:
+            self.cache.set(key, rows, version)
+        else:
+            with self._local_lock:
+                self._query_results[key] = (version, rows)
+                while len(self._query_results) > QUERY_CACHE_SIZE:
+                    self._query_results.popitem(last=False)
+        return rows
+
     def add_game_result(
         self,
         date: str,
@@ -275,20 +697,33 @@ class EurogamesAPIClient:
         Raises:
             APIError: If the request fails
         """
-        data = {
-            'date': date,
-            'game_id': game_id,
-            'winner': winner,
-            'scores': scores,
-            'comment': comment
-        }
-        # Remove None values
-        data = {k: v for k, v in data.items() if v is not None}
+        data = result_payload(date, game_id, winner, scores, comment)
 
         response = self._post('/v1/plays', data=data)
+        # A new play changes every list and stats response, in every worker.
+        # A failed invalidation is logged by the cache; this worker still drops its copies.
+        if self.cache is not None:
+            self.cache.invalidate()
+        with self._local_lock:
+            self._local_version += 1
+            self._query_results.clear()
+            self._game_details.clear()
+        if self.warm_start is not None:
+            self.warm_start.clear()
+        play = {'date': date, 'id': game_id, 'winner': winner, 'scores': scores, 'comment': comment}
+        for listener in self.result_listeners:
+            try:
+                listener(play)
+            except Exception as e:
+                # The play is recorded; a listener failing must not report it as lost
+                logger.warning("Result listener failed: %s", e, exc_info=True)
         return response.get('success', True) if isinstance(response, dict) else True
 
 
 class APIError(Exception):
     """Exception raised for API-related errors."""
-    pass
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status of an error response (None if there was no response)
+        self.status_code = status_code
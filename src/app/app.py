@@ -1,26 +1,181 @@
-from flask import Flask, render_template, request, flash, redirect, url_for, jsonify
+from flask import Flask, Response, render_template, request, flash, redirect, url_for, jsonify, stream_template
+from flask import get_template_attribute
+from werkzeug.local import LocalProxy
 from api_client import EurogamesAPIClient, APIError
+from live_updates import EventBroker, LiveSync
+from log_config import configure_logging, install_request_logging
+from ratings import OVERALL, EloRatings, PlayerRatings
+from scheduler import request_priority
+from search_index import GameSearchIndex
+from profiling import install_profiler
+from tracing import install_tracing
 import os
+import json
 import logging
-import sys
+import threading
+import time
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('FLASK_SECRET_KEY')
+# Per-request profiling, off unless EUROGAMES_PROFILE_TOKEN is set: send that token in X-Profile-Token
+# with "X-Profile: sample|cprofile" or ?profile
+install_profiler(app)
+# Request tracing, enabled by EUROGAMES_TRACE_FILE or EUROGAMES_OTLP_ENDPOINT
+install_tracing(app)
 
-# Configure logging to show DEBUG level
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    stream=sys.stdout
-)
+# Logging goes through a background queue; DEBUG is sampled per route and rate limited (see log_config)
+configure_logging(logging.DEBUG)
+install_request_logging(app)
 logger = logging.getLogger(__name__)
 logger.info("Flask app starting up")
 
-# Initialize API client
-logger.info(f"EUROGAMES_API_URL: {os.environ.get('EUROGAMES_API_URL')}")
-logger.info(f"EUROGAMES_API_KEY configured: {bool(os.environ.get('EUROGAMES_API_KEY'))}")
-api_client = EurogamesAPIClient()
-logger.info("API client initialized")
+# The API client (and its HTTP transport, cache and warm-start snapshot) is created on first use
+_api_client = None
+_api_client_lock = threading.Lock()
+
+
+def get_api_client():
+    """Return the shared API client, creating it on first use."""
+    global _api_client
+    if _api_client is None:
+        with _api_client_lock:
+            if _api_client is None:
+                logger.info("EUROGAMES_API_URL: %s", os.environ.get('EUROGAMES_API_URL'))
+                logger.info("EUROGAMES_API_KEY configured: %s", bool(os.environ.get('EUROGAMES_API_KEY')))
+                _api_client = EurogamesAPIClient()
+                logger.info("API client initialized")
+    return _api_client
+
+
+api_client = LocalProxy(get_api_client)
+
+# Search index is rebuilt from the catalogue at most once per TTL
+SEARCH_INDEX_TTL = 600
+_search_index = None
+_search_index_built = 0.0
+
+
+def get_search_index():
+    """Return the catalogue search index, rebuilding it when stale."""
+    global _search_index, _search_index_built
+    if _search_index is None or time.monotonic() - _search_index_built > SEARCH_INDEX_TTL:
+        # A /search request is waiting on this, so it must not queue behind bulk work
+        with request_priority('interactive'):
+            export = api_client.export_data()
+        statuses = {n.get('id'): n.get('status') for n in export.get('notes', [])}
+        games = [dict(g, status=statuses.get(g.get('id'))) for g in export.get('bgg', [])]
+        _search_index = GameSearchIndex(games)
+        _search_index_built = time.monotonic()
+        logger.info("Search index built over %d games", len(_search_index))
+    return _search_index
+
+
+def _winner_row(game_id, name, games, wins):
+    """A row of the winners table: wins by player (also as columns named after them) and Andrew's win ratio."""
+    games = games or 0
+    wins = {player: count or 0 for player, count in wins.items()}
+    return {
+        'id': game_id,
+        'name': name,
+        'Games': games,
+        **wins,
+        'wins': wins,
+        'AndrewRatio': round(100 * float(wins.get('Andrew', 0)) / games, 1) if games > 0 else 0,
+    }
+
+
+def _winner_totals(rows):
+    """Plays and wins by player over the rows of the winners table, most wins first (as games/totals)."""
+    wins = {}
+    for row in rows:
+        for player, count in row['wins'].items():
+            wins[player] = wins.get(player, 0) + count
+    wins = dict(sorted(wins.items(), key=lambda item: (-item[1], item[0])))
+    return {'Games': sum(row['Games'] for row in rows), 'wins': wins}
+
+
+def _wins(value):
+    """Wins by player from a query's JSON wins column."""
+    return json.loads(value) if isinstance(value, str) else (value or {})
+
+
+# Live updates: new plays are pushed to open pages over /events
+broker = EventBroker()
+
+
+def _render_live(kind, row):
+    """Render the table fragment for one live update (see templates/rows.html)."""
+    macro = {'result': 'result_row', 'winner': 'winner_row', 'last_played': 'last_played_row',
+             'totals': 'winner_totals'}[kind]
+    if kind == 'winner':
+        row = _winner_row(row['id'], row['name'], row['games'], _wins(row['wins']))
+    elif kind == 'totals':
+        row = {'Games': row['Games'], 'wins': _wins(row['wins'])}
+    with app.app_context():
+        return str(get_template_attribute('rows.html', macro)(row)).strip()
+
+
+live_sync = LiveSync(get_api_client, broker, _render_live,
+                     interval=float(os.environ.get('EUROGAMES_LIVE_SYNC_INTERVAL', 30)))
+
+
+# Player ratings are built (or loaded from their checkpoint) on first use
+_ratings = None
+_ratings_lock = threading.Lock()
+
+
+def get_ratings():
+    """Return the player ratings, creating them on first use and keeping them updated by new results."""
+    global _ratings
+    if _ratings is None:
+        with _ratings_lock:
+            if _ratings is None:
+                players = [p.strip() for p in os.environ.get('EUROGAMES_PLAYERS', '').split(',') if p.strip()]
+                engine = EloRatings(players, k=float(os.environ.get('EUROGAMES_ELO_K', 32)))
+                ratings = PlayerRatings(get_api_client, engine, path=os.environ.get('EUROGAMES_RATINGS_FILE'))
+                get_api_client().result_listeners.append(ratings.record)
+                _ratings = ratings
+    # A checkpoint loads well within this; a full build carries on in the background
+    _ratings.ensure(wait=0.5)
+    return _ratings
+
+
+# Number of template events joined into each streamed chunk
+STREAM_CHUNK_SIZE = 256
+
+
+def _chunked(events, size):
+    """Send the template preamble straight away, then group the remaining events into chunks."""
+    events = iter(events)
+    first = next(events, None)
+    if first is not None:
+        yield first
+    buffer = []
+    for event in events:
+        buffer.append(event)
+        if len(buffer) >= size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def render_streamed(template_name, **context):
+    """
+    Render a template as a streamed response.
+
+    The markup before the first loop (headers, forms) is flushed immediately and
+    table rows follow in chunks, so the full page is never held in memory.
+    """
+    # stream_template keeps the request context and fires the render signals (e.g. for tracing)
+    return Response(_chunked(stream_template(template_name, **context), STREAM_CHUNK_SIZE),
+                    mimetype='text/html')
+
+
+def _float_arg(name):
+    """Read an optional numeric query parameter."""
+    value = request.args.get(name, '').strip()
+    return float(value) if value else None
 
 
 @app.route("/")
@@ -34,14 +189,14 @@ def games():
     try:
         logger.debug("Calling get_games_list()")
         games_list = api_client.get_games_list()
-        logger.info(f"Successfully fetched {len(games_list)} games")
-        return render_template("games.html", games=games_list)
+        logger.info("Successfully fetched %d games", len(games_list))
+        return render_streamed("games.html", games=iter(games_list))
     except APIError as e:
-        logger.error(f"API error fetching games: {e}", exc_info=True)
+        logger.error("API error fetching games: %s", e, exc_info=True)
         flash("Error fetching games from API", "error")
         return render_template("games.html", games=[])
     except Exception as e:
-        logger.error(f"Unexpected error in /games: {e}", exc_info=True)
+        logger.error("Unexpected error in /games: %s", e, exc_info=True)
         flash("Unexpected error fetching games", "error")
         return render_template("games.html", games=[])
 
@@ -56,7 +211,7 @@ def game(game_id):
             flash("Game not found", "error")
             return redirect(url_for('games'))
     except APIError as e:
-        logger.error(f"API error fetching game {game_id}: {e}")
+        logger.error("API error fetching game %s: %s", game_id, e)
         flash("Error fetching game details", "error")
         return redirect(url_for('games'))
 
@@ -67,20 +222,20 @@ def played():
     try:
         logger.debug("Calling get_played_results()")
         results = api_client.get_played_results()
-        logger.debug(f"Got {len(results)} results")
+        logger.debug("Got %d results", len(results))
         logger.debug("Calling get_all_games()")
         games_list = api_client.get_all_games()
-        logger.debug(f"Got {len(games_list)} games")
-        # Extract just id and name from games
-        games = [{'id': g.get('id'), 'name': g.get('name')} for g in games_list]
-        logger.info(f"Successfully fetched {len(results)} results and {len(games)} games")
-        return render_template("results.html", results=results, games=games)
+        logger.debug("Got %d games", len(games_list))
+        # Extract just id and name from games, lazily as the form renders
+        games = ({'id': g.get('id'), 'name': g.get('name')} for g in games_list)
+        logger.info("Successfully fetched %d results and %d games", len(results), len(games_list))
+        return render_streamed("results.html", results=iter(results), games=games)
     except APIError as e:
-        logger.error(f"API error fetching results: {e}", exc_info=True)
+        logger.error("API error fetching results: %s", e, exc_info=True)
         flash("Error fetching results from API", "error")
         return render_template("results.html", results=[], games=[])
     except Exception as e:
-        logger.error(f"Unexpected error in /results: {e}", exc_info=True)
+        logger.error("Unexpected error in /results: %s", e, exc_info=True)
         flash("Unexpected error fetching results", "error")
         return render_template("results.html", results=[], games=[])
 
@@ -91,7 +246,7 @@ def lastPlayed():
         games_list = api_client.get_last_played()
         return render_template("last_played.html", games=games_list)
     except APIError as e:
-        logger.error(f"API error fetching last played: {e}")
+        logger.error("API error fetching last played: %s", e)
         flash("Error fetching last played games", "error")
         return render_template("last_played.html", games=[])
 
@@ -102,41 +257,96 @@ def winner():
     try:
         logger.debug("Calling get_winner_stats()")
         games_list = api_client.get_winner_stats()
-        logger.debug(f"Got {len(games_list)} winner stats")
+        logger.debug("Got %d winner stats", len(games_list))
 
         # Transform API response to match template expectations
         # API returns: gameId, gameName, totalGames, andrew, trish, draw
         # Template expects: id, name, Games, Andrew, Trish, Draw, AndrewRatio
-        transformed = []
-        for game in games_list:
-            transformed_game = {
-                'id': game.get('gameId'),
-                'name': game.get('gameName'),
-                'Games': game.get('totalGames'),
-                'Andrew': game.get('andrew'),
-                'Trish': game.get('trish'),
-                'Draw': game.get('draw')
-            }
-            # Calculate Andrew's win ratio
-            total = transformed_game.get('Games', 0)
-            andrew_wins = transformed_game.get('Andrew', 0)
-            if total > 0:
-                transformed_game['AndrewRatio'] = round(100 * float(andrew_wins) / total, 1)
-            else:
-                transformed_game['AndrewRatio'] = 0
-
-            transformed.append(transformed_game)
-
-        logger.info(f"Successfully transformed {len(transformed)} winner stats")
-        return render_template("winner.html", games=transformed)
+        transformed = [
+            _winner_row(game.get('gameId'), game.get('gameName'), game.get('totalGames'),
+                        {'Andrew': game.get('andrew'), 'Trish': game.get('trish'), 'Draw': game.get('draw')})
+            for game in games_list
+        ]
+
+        logger.info("Successfully transformed %d winner stats", len(transformed))
+        return render_template("winner.html", games=transformed, totals=_winner_totals(transformed))
     except APIError as e:
-        logger.error(f"API error fetching winner stats: {e}", exc_info=True)
+        logger.error("API error fetching winner stats: %s", e, exc_info=True)
         flash("Error fetching winner statistics", "error")
-        return render_template("winner.html", games=[])
+        return render_template("winner.html", games=[], totals=_winner_totals([]))
     except Exception as e:
-        logger.error(f"Unexpected error in /winner: {e}", exc_info=True)
+        logger.error("Unexpected error in /winner: %s", e, exc_info=True)
         flash("Unexpected error fetching winner statistics", "error")
-        return render_template("winner.html", games=[])
+        return render_template("winner.html", games=[], totals=_winner_totals([]))
+
+
+@app.route("/search")
+def search():
+    mechanics = [m for m in request.args.getlist('mechanic') if m]
+    categories = [c for c in request.args.getlist('category') if c]
+    try:
+        players = _float_arg('players')
+        ranges = {
+            'complexity': (_float_arg('complexity_min'), _float_arg('complexity_max')),
+            'playingTime': (_float_arg('time_min'), _float_arg('time_max')),
+            'ranking': (_float_arg('rank_min'), _float_arg('rank_max')),
+        }
+    except ValueError:
+        flash("Invalid search parameters", "error")
+        players, ranges = None, {}
+
+    try:
+        index = get_search_index()
+        ids = index.search(mechanics=mechanics, categories=categories, players=players, ranges=ranges)
+        return render_template(
+            "search.html",
+            games=index.rows(ids),
+            mechanic_facets=index.facet_counts('mechanic', ids),
+            category_facets=index.facet_counts('category', ids),
+            selected_mechanics=mechanics,
+            selected_categories=categories,
+            args=request.args)
+    except APIError as e:
+        logger.error("API error building search index: %s", e, exc_info=True)
+        flash("Error fetching catalogue for search", "error")
+        return render_template("search.html", games=[], mechanic_facets=[], category_facets=[],
+                               selected_mechanics=mechanics, selected_categories=categories,
+                               args=request.args)
+
+
+@app.route("/events")
+def events():
+    """Server-sent event stream of new plays and the stats rows they change."""
+    live_sync.start()
+    stream = broker.stream(request.headers.get('Last-Event-ID'))
+    return Response(stream, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route("/ratings")
+@app.route("/ratings/<game_id>")
+def ratings(game_id=None):
+    scope = game_id or OVERALL
+    try:
+        view = get_ratings().view(scope)
+    except APIError as e:
+        logger.error("API error building ratings: %s", e, exc_info=True)
+        flash("Error fetching plays for ratings", "error")
+        view = {'building': False, 'standings': [], 'series': [], 'players': [], 'plays': 0, 'name': None,
+                'initial': 1500, 'games': []}
+    return render_template("ratings.html", game_id=game_id, **view)
+
+
+# Rating history series, for charts elsewhere: one point per player per play
+@app.route("/ratings/history")
+def ratings_history():
+    try:
+        view = get_ratings().view(request.args.get('game') or OVERALL)
+        return jsonify({'building': view['building'], 'players': view['players'], 'standings': view['standings'],
+                        'series': view['series']})
+    except APIError as e:
+        logger.error("API error building ratings: %s", e)
+        return jsonify({"error": str(e)}), 500
 
 
 # API response for just the winner totals
@@ -146,7 +356,7 @@ def totals():
         total_data = api_client.get_totals()
         return jsonify([total_data] if isinstance(total_data, dict) else total_data)
     except APIError as e:
-        logger.error(f"API error fetching totals: {e}")
+        logger.error("API error fetching totals: %s", e)
         return jsonify({"error": str(e)}), 500
 
 
@@ -169,6 +379,8 @@ def addResult():
         )
 
         if success:
+            # Push the new row and stats to open pages without waiting for the next check
+            live_sync.notify()
             flash('Result added successfully!', 'success')
         else:
             flash('Failed to add result', 'error')
@@ -176,15 +388,15 @@ def addResult():
         return redirect(url_for('played'))
 
     except ValueError as e:
-        logger.error(f"Validation error when adding result: {e}")
+        logger.error("Validation error when adding result: %s", e)
         flash('Invalid input provided', 'error')
         return redirect(url_for('played'))
     except APIError as e:
-        logger.error(f"API error adding result: {e}")
+        logger.error("API error adding result: %s", e)
         flash(f'Error adding result: {str(e)}', 'error')
         return redirect(url_for('played'))
     except Exception as e:
-        logger.error(f"Unexpected error adding result: {e}")
+        logger.error("Unexpected error adding result: %s", e)
         flash('An unexpected error occurred', 'error')
         return redirect(url_for('played'))
 
@@ -0,0 +1,235 @@
+"""
+Compact, chunked, column-oriented archive of the bgg, notes and log tables.
+
+Layout:
+    magic    b'EGAR' + format version (1 byte)
+    header   u32 length + JSON {tables: {name: {columns, types}}, chunk_rows, created}
+    chunks   b'CHNK' + table index (u16) + rows (u32) + payload length (u32) + CRC32 (u32),
+             followed by a zlib-compressed JSON list of column value lists
+    end      b'END!'
+
+Each chunk carries its own checksum, so corruption is detected per chunk,
+and chunks of tables that are not being restored are skipped unread.
+
+Usage:
+    python archive.py export <file>
+    python archive.py restore <file> <sqlite-db> [table ...]
+"""
+
+import json
+import logging
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'EGAR'
+FORMAT_VERSION = 1
+CHUNK_TAG = b'CHNK'
+END_TAG = b'END!'
+CHUNK_HEADER = struct.Struct('<4sHIII')
+
+# Column layout of the exported tables (see migrations/0001_initial_schema.sql)
+TABLE_SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    'bgg': [('id', 'INTEGER PRIMARY KEY'), ('yearPublished', 'INTEGER'), ('complexity', 'FLOAT'),
+            ('playingTime', 'INTEGER'), ('mechanic', 'TEXT'), ('category', 'TEXT'), ('maxPlayers', 'INTEGER'),
+            ('minPlayers', 'INTEGER'), ('name', 'TEXT'), ('rating', 'FLOAT'), ('ranking', 'INTEGER'),
+            ('retrieved', 'TEXT')],
+    'notes': [('id', 'INTEGER'), ('status', 'TEXT'), ('platform', 'TEXT'), ('uri', 'TEXT'), ('comment', 'TEXT')],
+    'log': [('date', 'TEXT'), ('id', 'INTEGER'), ('winner', 'TEXT'), ('scores', 'TEXT'), ('comment', 'TEXT')],
+}
+
+
+class ArchiveError(Exception):
+    """Exception raised for malformed or corrupt archives."""
+    pass
+
+
+def write_archive(path: str, tables: Dict[str, Iterable[Dict[str, Any]]], chunk_rows: int = 5000,
+                  level: int = 6) -> Dict[str, int]:
+    """
+    Stream table rows into an archive file, one compressed chunk at a time.
+
+    Args:
+        path: Output file
+        tables: Mapping of table name to an iterable of row dicts
+        chunk_rows: Rows per chunk
+        level: zlib compression level
+
+    Returns:
+        Number of rows written per table
+    """
+    names = [name for name in TABLE_SCHEMAS if name in tables]
+    header = {
+        'tables': {name: {'columns': [c for c, _ in TABLE_SCHEMAS[name]],
+                          'types': [t for _, t in TABLE_SCHEMAS[name]]} for name in names},
+        'chunk_rows': chunk_rows,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    counts = {}
+    with open(path, 'wb') as f:
+        header_bytes = json.dumps(header).encode()
+        f.write(MAGIC + bytes([FORMAT_VERSION]) + struct.pack('<I', len(header_bytes)) + header_bytes)
+
+        for index, name in enumerate(names):
+            columns = header['tables'][name]['columns']
+            counts[name] = 0
+            for rows in _batches(tables[name], chunk_rows):
+                payload = zlib.compress(
+                    json.dumps([[row.get(c) for row in rows] for c in columns], separators=(',', ':')).encode(),
+                    level)
+                f.write(CHUNK_HEADER.pack(CHUNK_TAG, index, len(rows), len(payload), zlib.crc32(payload)))
+                f.write(payload)
+                counts[name] += len(rows)
+        f.write(END_TAG)
+    logger.info("Archive written to %s: %s", path, counts)
+    return counts
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _read_exact(f, size: int) -> bytes:
+    """Read exactly `size` bytes, raising ArchiveError if the file ends first."""
+    data = f.read(size)
+    if len(data) < size:
+        raise ArchiveError("Archive is truncated")
+    return data
+
+
+def read_header(f) -> Dict[str, Any]:
+    """Read and validate the archive header from an open file."""
+    if f.read(4) != MAGIC:
+        raise ArchiveError("Not a eurogames archive")
+    version = _read_exact(f, 1)[0]
+    if version != FORMAT_VERSION:
+        raise ArchiveError(f"Unsupported archive version {version}")
+    (length,) = struct.unpack('<I', _read_exact(f, 4))
+    try:
+        header = json.loads(_read_exact(f, length))
+    except ValueError as e:
+        raise ArchiveError(f"Corrupt archive header: {e}") from e
+    if not isinstance(header, dict) or not isinstance(header.get('tables'), dict):
+        raise ArchiveError("Corrupt archive header: no table list")
+    return header
+
+
+def _chunks(f, names: List[str], wanted: Optional[set]) -> Iterator[Tuple[str, int, bytes, int]]:
+    """Yield (table, rows, payload, crc) for wanted chunks, seeking past the others."""
+    while True:
+        tag = f.read(4)
+        if tag == END_TAG:
+            return
+        if len(tag) < 4:
+            raise ArchiveError("Archive is truncated")
+        if tag != CHUNK_TAG:
+            raise ArchiveError("Corrupt archive: expected a chunk")
+        _, index, rows, length, crc = CHUNK_HEADER.unpack(tag + _read_exact(f, CHUNK_HEADER.size - 4))
+        if index >= len(names):
+            raise ArchiveError(f"Corrupt archive: chunk for unknown table {index}")
+        name = names[index]
+        if wanted is not None and name not in wanted:
+            f.seek(length, 1)
+            continue
+        yield name, rows, _read_exact(f, length), crc
+
+
+def _decode(name: str, rows: int, payload: bytes, crc: int) -> Tuple[str, List[tuple]]:
+    """Verify and decompress one chunk into row tuples."""
+    if zlib.crc32(payload) != crc:
+        raise ArchiveError(f"Checksum mismatch in a '{name}' chunk")
+    try:
+        columns = json.loads(zlib.decompress(payload))
+    except (zlib.error, ValueError) as e:
+        raise ArchiveError(f"Corrupt '{name}' chunk: {e}") from e
+    values = list(zip(*columns))
+    if len(values) != rows:
+        raise ArchiveError(f"Row count mismatch in a '{name}' chunk")
+    return name, values
+
+
+def restore_archive(path: str, db_path: str, tables: Optional[Iterable[str]] = None,
+                    workers: int = 4) -> Dict[str, int]:
+    """
+    Restore tables from an archive into a local SQLite database.
+
+    Chunks are verified and decompressed in parallel while a single writer
+    inserts them in batches. Restored tables are replaced, others are untouched.
+
+    Args:
+        path: Archive file
+        db_path: SQLite database file (created if missing)
+        tables: Tables to restore (default: all tables in the archive)
+        workers: Number of decompression threads
+
+    Returns:
+        Number of rows restored per table
+
+    Raises:
+        ArchiveError: If the archive is malformed, truncated or fails a checksum
+    """
+    with open(path, 'rb') as f:
+        header = read_header(f)
+        names = list(header['tables'])
+        wanted = set(tables) if tables is not None else set(names)
+        unknown = wanted - set(names)
+        if unknown:
+            raise ArchiveError(f"Tables not in archive: {', '.join(sorted(unknown))}")
+
+        conn = sqlite3.connect(db_path)
+        counts = {name: 0 for name in names if name in wanted}
+        try:
+            with conn:
+                for name in counts:
+                    spec = header['tables'][name]
+                    columns = ', '.join(f"[{c}] {t}" for c, t in zip(spec['columns'], spec['types']))
+                    conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" ({columns})')
+                    conn.execute(f'DELETE FROM "{name}"')
+
+                inserts = {}
+                for name in counts:
+                    cols = header['tables'][name]['columns']
+                    inserts[name] = (f'INSERT INTO "{name}" ({", ".join(f"[{c}]" for c in cols)}) '
+                                     f'VALUES ({", ".join("?" * len(cols))})')
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    # Bound the number of chunks in flight so memory stays flat
+                    pending = []
+                    for chunk in _chunks(f, names, wanted):
+                        pending.append(pool.submit(_decode, *chunk))
+                        if len(pending) >= workers * 2:
+                            name, values = pending.pop(0).result()
+                            conn.executemany(inserts[name], values)
+                            counts[name] += len(values)
+                    for future in pending:
+                        name, values = future.result()
+                        conn.executemany(inserts[name], values)
+                        counts[name] += len(values)
+        finally:
+            conn.close()
+    logger.info("Restored %s from %s into %s", counts, path, db_path)
+    return counts
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) >= 3 and sys.argv[1] == 'export':
+        from api_client import EurogamesAPIClient
+        print(EurogamesAPIClient().export_archive(sys.argv[2]))
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'restore':
+        print(restore_archive(sys.argv[2], sys.argv[3], sys.argv[4:] or None))
+    else:
+        print(f"Usage: {sys.argv[0]} export <file> | restore <file> <sqlite-db> [table ...]")
+        sys.exit(1)
@@ -0,0 +1,213 @@
+"""
+Non-blocking REST API client for Eurogames database.
+Async counterpart of EurogamesAPIClient for the FastHTML (ASGI) app.
+"""
+
+import asyncio
+import json
+import os
+import logging
+from typing import TYPE_CHECKING, Iterable, List, Dict, Any, Optional, Union
+from urllib.parse import urljoin
+
+from api_client import (APIError, BULK_FETCH_WORKERS, DEFAULT_API_URL, unwrap_list, unwrap_game,
+                        unwrap_totals, result_payload, is_warmable)
+from warm_start import WarmStartStore
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of the response an httpx error was raised for, if any."""
+    # Only httpx.HTTPStatusError carries a response
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+class AsyncEurogamesAPIClient:
+    """Async client for the Eurogames REST API, sharing one pooled connection set."""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: int = 10,
+                 max_connections: int = 20, warm_start: Optional[str] = None):
+        """
+        Initialize the API client.
+
+        Args:
+            base_url: Base URL of the API (default from EUROGAMES_API_URL env var)
+            api_key: API key for authentication (default from EUROGAMES_API_KEY env var)
+            timeout: Request timeout in seconds
+            max_connections: Maximum number of concurrent upstream connections
+            warm_start: Warm-start snapshot file (default from EUROGAMES_WARM_START env var, if set)
+        """
+        self.base_url = (base_url or os.environ.get('EUROGAMES_API_URL', DEFAULT_API_URL)).rstrip('/')
+        self.api_key = api_key or os.environ.get('EUROGAMES_API_KEY')
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional['httpx.AsyncClient'] = None
+        self._revalidations: set = set()
+        # Writes made through this client; a response that raced one is not recorded for warm start
+        self._writes = 0
+        warm_start = warm_start or os.environ.get('EUROGAMES_WARM_START')
+        self.warm_start = WarmStartStore(warm_start, self._warm_start_stamp) if warm_start else None
+        if self.warm_start is not None:
+            self.warm_start.start()
+
+    def _warm_start_stamp(self) -> Dict[str, Any]:
+        """Version stamp a warm-start snapshot must match to be used (the same as the sync client's)."""
+        return {'base_url': self.base_url}
+
+    def _http(self) -> 'httpx.AsyncClient':
+        """Return the shared HTTP client, creating it inside the running event loop on first use."""
+        if self._client is None:
+            # httpx is imported on first use, keeping it out of app startup
+            import httpx
+            headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url + '/',
+                headers=headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections))
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections (call on application shutdown)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _revalidate(self, endpoint: str, params: Optional[Dict[str, Any]], key: str) -> None:
+        """Refetch a request served from the warm-start snapshot."""
+        try:
+            await self._get(endpoint, params, allow_stale=False)
+        except APIError as e:
+            logger.warning("Revalidating %s failed: %s", endpoint, e)
+        finally:
+            self.warm_start.release_revalidation(key)
+
+    async def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, allow_stale: bool = True) -> Any:
+        """
+        Make a GET request to the API.
+
+        Args:
+            endpoint: API endpoint path (e.g., '/games')
+            params: Query parameters
+            allow_stale: Serve warm-start snapshot data not yet refetched since startup
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            APIError: If the request fails
+        """
+        # Keyed like the sync client's requests, so the two can share a snapshot file
+        key = urljoin(self.base_url + '/', endpoint.lstrip('/')) + '?' + json.dumps(params, sort_keys=True)
+        warm = self.warm_start is not None and is_warmable(endpoint)
+        writes = self._writes
+        if warm and allow_stale:
+            stale = self.warm_start.stale(key)
+            if stale is not None:
+                if self.warm_start.claim_revalidation(key):
+                    # Keep a reference so the task is not garbage collected mid-flight
+                    task = asyncio.create_task(self._revalidate(endpoint, params, key))
+                    self._revalidations.add(task)
+                    task.add_done_callback(self._revalidations.discard)
+                return stale
+
+        import httpx
+        try:
+            response = await self._http().get(endpoint.lstrip('/'), params=params)
+            response.raise_for_status()
+            data = response.json()
+            if warm and writes == self._writes:
+                self.warm_start.record(key, data)
+            return data
+        except httpx.HTTPError as e:
+            logger.error("API request failed: %s", e)
+            raise APIError(f"API request failed: {str(e)}", status_code=_status_code(e)) from e
+        except ValueError as e:
+            logger.error("Invalid JSON from %s: %s", endpoint, e)
+            raise APIError(f"Invalid JSON in response from {endpoint}: {e}") from e
+
+    async def _post(self, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Make a POST request to the API.
+
+        Args:
+            endpoint: API endpoint path
+            data: Request body data
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            APIError: If the request fails
+        """
+        import httpx
+        try:
+            response = await self._http().post(endpoint.lstrip('/'), json=data)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise APIError(f"API request failed: {str(e)}", status_code=_status_code(e)) from e
+        except ValueError as e:
+            raise APIError(f"Invalid JSON in response from {endpoint}: {e}") from e
+
+    async def get_games_list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get list of games, optionally filtered by status."""
+        params = {'status': status} if status is not None else None
+        return unwrap_list(await self._get('/v1/games', params=params), 'games')
+
+    async def get_game_details(self, game_id: int) -> Optional[Dict[str, Any]]:
+        """Get detailed information for a single game."""
+        return unwrap_game(await self._get(f'/v1/games/{game_id}'))
+
+    async def get_games_details(self, game_ids: Iterable[Union[int, str]],
+                                max_workers: int = BULK_FETCH_WORKERS) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get details for many games, fetching each distinct id once, at most max_workers at a time.
+
+        Returns details in input order, with None for games the API does not have (404).
+        """
+        game_ids = list(game_ids)
+        unique = list(dict.fromkeys(str(game_id) for game_id in game_ids))
+        limit = asyncio.Semaphore(max_workers)
+
+        async def fetch(game_id: str) -> Optional[Dict[str, Any]]:
+            async with limit:
+                try:
+                    return await self.get_game_details(game_id)
+                except APIError as e:
+                    if e.status_code == 404:
+                        return None
+                    raise
+
+        found = dict(zip(unique, await asyncio.gather(*(fetch(game_id) for game_id in unique))))
+        return [found[str(game_id)] for game_id in game_ids]
+
+    async def get_played_results(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get game play results, most recent first."""
+        return unwrap_list(await self._get('/v1/plays', params={'limit': limit}), 'plays')
+
+    async def get_last_played(self) -> List[Dict[str, Any]]:
+        """Get last played dates for games."""
+        return unwrap_list(await self._get('/v1/stats/last-played'), 'games')
+
+    async def get_winner_stats(self) -> List[Dict[str, Any]]:
+        """Get winner statistics."""
+        return unwrap_list(await self._get('/v1/stats/winners'), 'winners')
+
+    async def get_totals(self) -> Dict[str, Any]:
+        """Get aggregated win totals."""
+        return unwrap_totals(await self._get('/v1/stats/totals'))
+
+    async def add_game_result(self, date: str, game_id: int, winner: str, scores: Optional[str] = None,
+                              comment: Optional[str] = None) -> bool:
+        """Record a new game result."""
+        response = await self._post('/v1/plays', data=result_payload(date, game_id, winner, scores, comment))
+        self._writes += 1
+        if self.warm_start is not None:
+            self.warm_start.clear()
+        return response.get('success', True) if isinstance(response, dict) else True
@@ -0,0 +1,83 @@
+"""
+Single-pass HTML table renderer for the FastHTML app.
+Emits the same markup as Table(Thead(...), Tbody(*makeRows(...))) without
+building an FT component per row and cell.
+"""
+
+from html import escape
+from typing import Any, Iterable, Iterator, List, Tuple
+
+from fastcore.xml import NotStr
+
+
+def _cell(value: Any) -> str:
+    """Escape a cell value the way FT rendering does (None renders empty)."""
+    return '' if value is None else escape(str(value), quote=False)
+
+
+class FastTable:
+    """Table component built once from column specs and reused for each response."""
+
+    def __init__(self, columns: List[Tuple[str, str]]):
+        """
+        Args:
+            columns: List of (header label, row key) pairs in display order
+        """
+        self.keys = [key for _, key in columns]
+        header_cells = ''.join(f'      <th>{_cell(label)}</th>\n' for label, _ in columns)
+        self.head = f'<table>\n  <thead>\n    <tr>\n{header_cells}    </tr>\n  </thead>\n'
+        self.tail = '  </tbody>\n</table>\n'
+
+    def rows(self, data: Iterable[Any]) -> Iterator[str]:
+        """
+        Render each record as one escaped <tr> string.
+
+        Args:
+            data: Dicts or objects carrying the column keys
+
+        Yields:
+            HTML for one table row
+        """
+        keys = self.keys
+        for d in data:
+            if isinstance(d, dict):
+                values = [d.get(k, '') for k in keys]
+            else:
+                values = [getattr(d, k, '') for k in keys]
+            cells = ''.join(f'      <td>{_cell(v)}</td>\n' for v in values)
+            yield f'    <tr>\n{cells}    </tr>\n'
+
+    def render(self, data: Iterable[Any]) -> NotStr:
+        """
+        Render the whole table in a single pass.
+
+        Returns:
+            Pre-rendered markup that FastHTML sends without re-escaping
+        """
+        body = ''.join(self.rows(data))
+        # FT renders a childless tbody inline
+        if not body:
+            return NotStr(self.head + '  <tbody></tbody>\n</table>\n')
+        return NotStr(self.head + '  <tbody>\n' + body + self.tail)
+
+    def stream(self, data: Iterable[Any], chunk_rows: int = 200) -> Iterator[str]:
+        """
+        Render the table as a sequence of chunks for a StreamingResponse.
+
+        Args:
+            data: Records to render
+            chunk_rows: Number of rows joined into each chunk
+
+        Yields:
+            The table head first, then groups of rows, then the closing tags
+        """
+        yield self.head + '  <tbody>\n'
+        buffer = []
+        for row in self.rows(data):
+            buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                yield ''.join(buffer)
+                buffer = []
+        if buffer:
+            yield ''.join(buffer)
+        yield self.tail
@@ -0,0 +1,221 @@
+"""
+Live updates for open pages, sent as server-sent events (SSE).
+
+EventBroker fans events out to every connected /events stream and keeps a
+short history, so a browser that reconnects with Last-Event-ID misses nothing.
+
+LiveSync watches for new plays while anyone is listening: straight away when
+this process records one (notify()), when the shared cache's data version
+moves because another worker did, and every `interval` seconds to catch writes
+made by other API clients. For each new play it publishes the rendered table
+row and the updated stats rows of that game, never the whole page.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from scheduler import request_priority
+
+logger = logging.getLogger(__name__)
+
+# Sent when nothing else has been, so proxies keep the connection open
+HEARTBEAT = ': keepalive\n\n'
+
+
+def format_event(event_id: int, event: str, data: str) -> str:
+    """Encode one event in the text/event-stream format."""
+    lines = ''.join(f"data: {line}\n" for line in data.splitlines() or [''])
+    return f"id: {event_id}\nevent: {event}\n{lines}\n"
+
+
+def _drain(q: queue.Queue) -> None:
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return
+
+
+class EventBroker:
+    """Publishes named events to every subscribed stream, keeping the most recent ones for replay."""
+
+    def __init__(self, history: int = 200, queue_size: int = 500):
+        """
+        Args:
+            history: Events kept for clients reconnecting with Last-Event-ID
+            queue_size: Undelivered events a subscriber may fall behind by before it is disconnected
+        """
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._history: deque = deque(maxlen=history)
+        self._subscribers: List[queue.Queue] = []
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event: str, data: str) -> int:
+        """Send an event to all subscribers, returning its id."""
+        with self._lock:
+            event_id = next(self._ids)
+            frame = format_event(event_id, event, data)
+            self._history.append((event_id, frame))
+            for subscriber in list(self._subscribers):
+                try:
+                    subscriber.put_nowait(frame)
+                except queue.Full:
+                    # A client this far behind reconnects and catches up from the history
+                    self._subscribers.remove(subscriber)
+                    _drain(subscriber)
+                    subscriber.put_nowait(None)
+        return event_id
+
+    def stream(self, last_event_id: Optional[str] = None, heartbeat: float = 15.0) -> Iterator[str]:
+        """
+        Yield event-stream text for one client until it disconnects.
+
+        Args:
+            last_event_id: Last-Event-ID sent by a reconnecting browser; later events are replayed
+            heartbeat: Seconds of silence before a keepalive comment is sent
+        """
+        subscriber: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscriber)
+            try:
+                after = int(last_event_id) if last_event_id else None
+            except ValueError:
+                after = None
+            backlog = [frame for event_id, frame in self._history if after is not None and event_id > after]
+        try:
+            # Tell the browser to wait a few seconds before reconnecting
+            yield 'retry: 3000\n\n'
+            yield from backlog
+            while True:
+                try:
+                    frame = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield HEARTBEAT
+                    continue
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            with self._lock:
+                if subscriber in self._subscribers:
+                    self._subscribers.remove(subscriber)
+
+
+class LiveSync:
+    """Detects new plays and publishes their rows and stats deltas to an EventBroker."""
+
+    def __init__(self, get_client: Callable[[], Any], broker: EventBroker,
+                 render: Callable[[str, Dict[str, Any]], str], interval: float = 30.0, poll: float = 1.0,
+                 batch: int = 100):
+        """
+        Args:
+            get_client: Returns the EurogamesAPIClient to read new plays and stats through
+            broker: Where events are published
+            render: Renders a fragment: render(kind, row) with kind 'result', 'winner',
+                'last_played' or 'totals'
+            interval: Seconds between checks for writes made outside this app
+            poll: Seconds between checks of the local data version
+            batch: Most new plays fetched per request
+        """
+        self.get_client = get_client
+        self.broker = broker
+        self.render = render
+        self.interval = interval
+        self.poll = poll
+        self.batch = batch
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._high_water: Optional[int] = None
+
+    def start(self) -> None:
+        """Start the watcher thread, if it is not running yet."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='live-sync', daemon=True)
+                self._thread.start()
+
+    def notify(self) -> None:
+        """Check for new plays now, e.g. right after this process recorded one."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        version = None
+        last_sync = 0.0
+        while True:
+            woken = self._wake.wait(self.poll)
+            self._wake.clear()
+            if self.broker.subscriber_count() == 0:
+                # Nobody to tell: start from the newest play again when someone connects
+                self._high_water = None
+                continue
+            try:
+                client = self.get_client()
+                current = client.data_version()
+                due = time.monotonic() - last_sync >= self.interval
+                if woken or due or current != version or self._high_water is None:
+                    version = current
+                    last_sync = time.monotonic()
+                    with request_priority('background'):
+                        self.sync()
+            except Exception as e:
+                logger.warning("Live update check failed: %s", e)
+
+    def sync(self) -> int:
+        """
+        Publish events for plays recorded since the last call.
+
+        The first call only notes the newest play. Returns the number of new plays.
+        """
+        client = self.get_client()
+        if self._high_water is None:
+            self._high_water = client.run_query('games/latest-play', fresh=True)[0]['rowid']
+            return 0
+
+        plays: List[Dict[str, Any]] = []
+        while True:
+            rows = client.run_query('games/plays-since', {'rowid': self._high_water, 'limit': self.batch},
+                                    fresh=True)
+            plays.extend(rows)
+            if rows:
+                self._high_water = rows[-1]['rowid']
+            if len(rows) < self.batch:
+                break
+        if not plays:
+            return 0
+
+        # Newest last, so each one ends up at the top of the results table
+        for play in plays:
+            self.broker.publish('play', self.render('result', play))
+        for game_id in dict.fromkeys(play['id'] for play in plays):
+            rows = client.run_query('games/game-stats', {'id': game_id}, fresh=True)
+            if not rows:
+                continue
+            stats = rows[0]
+            winner = self.render('winner', stats)
+            # The last played view only lists games being played (the winners view lists them all)
+            last_played = self.render('last_played', stats) if stats.get('status') == 'Playing' else None
+            if stats['games'] == len([p for p in plays if p['id'] == game_id]):
+                # First plays of this game: it has no rows to update yet
+                self.broker.publish('winner-new', winner)
+                if last_played is not None:
+                    self.broker.publish('last-played-new', last_played)
+            else:
+                self.broker.publish(f'winner-{game_id}', winner)
+                if last_played is not None:
+                    self.broker.publish(f'last-played-{game_id}', last_played)
+        totals = client.run_query('games/totals', fresh=True)
+        if totals:
+            self.broker.publish('totals', self.render('totals', totals[0]))
+        logger.info("Published live updates for %d new plays", len(plays))
+        return len(plays)
@@ -0,0 +1,268 @@
+"""
+Load generator for the Flask (app.py) and FastHTML (main.py) web apps.
+
+Replays a weighted mix of page views and addResult submissions at a fixed
+arrival rate and reports throughput, latency percentiles and error rate per
+route. Latency is measured from each request's scheduled send time, so time
+spent waiting for a free worker counts against the server.
+
+addResult records real plays, so it is only sent to the spawned stub API,
+or to a --target when --allow-writes is given.
+
+Usage:
+    # Against an app that is already running (page views only)
+    python loadtest.py --target http://127.0.0.1:5000 --rate 50 --duration 30
+
+    # Including addResult submissions, which add plays to its database
+    python loadtest.py --target http://127.0.0.1:5000 --allow-writes
+
+    # Start the stub API and the app locally, then test
+    python loadtest.py --spawn flask --rate 50 --duration 30
+    python loadtest.py --spawn fasthtml --rate 50 --duration 30 --json results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from stub_api import start_stub
+
+# (weight, method, path) - '{id}' is replaced with a known game id
+FLASK_MIX = [
+    (25, 'GET', '/games'),
+    (25, 'GET', '/results'),
+    (15, 'GET', '/winner'),
+    (15, 'GET', '/lastPlayed'),
+    (10, 'GET', '/game/{id}'),
+    (5, 'GET', '/totals'),
+    (5, 'POST', '/addResult'),
+]
+
+FASTHTML_MIX = [
+    (30, 'GET', '/games'),
+    (30, 'GET', '/results'),
+    (20, 'GET', '/lastPlayed'),
+    (20, 'GET', '/winner'),
+]
+
+_local = threading.local()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class RouteStats:
+    """Latency samples and error count for one route."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool) -> None:
+        with self.lock:
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+    def summary(self, duration: float) -> Dict[str, float]:
+        values = sorted(self.latencies)
+        count = len(values)
+        return {
+            'requests': count,
+            'rps': round(count / duration, 2) if duration else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 1),
+            'p95_ms': round(percentile(values, 95) * 1000, 1),
+            'p99_ms': round(percentile(values, 99) * 1000, 1),
+            'max_ms': round(values[-1] * 1000, 1) if values else 0.0,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+        }
+
+
+def _session() -> requests.Session:
+    """Return this worker thread's HTTP session (keeps connections alive)."""
+    if not hasattr(_local, 'session'):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _issue(target: str, method: str, path: str, game_ids: List[int], stats: Dict[str, RouteStats],
+           timeout: float, due: float) -> None:
+    """
+    Send one request and record its latency under the route template.
+
+    The latency runs from `due`, the time the schedule meant to send the request,
+    not from when a worker picked it up; otherwise a backlog would hide the
+    very stalls the test is looking for (coordinated omission).
+    """
+    route = f"{method} {path}"
+    url = target + path.replace('{id}', str(random.choice(game_ids)))
+    try:
+        if method == 'POST':
+            form = {'date': time.strftime('%Y-%m-%d'), 'id': random.choice(game_ids),
+                    'winner': random.choice(('Andrew', 'Trish', 'Draw')), 'scores': '', 'comment': 'loadtest'}
+            response = _session().post(url, data=form, timeout=timeout, allow_redirects=False)
+            ok = response.status_code < 400
+        else:
+            response = _session().get(url, timeout=timeout, headers={'HX-Request': 'true'})
+            ok = response.status_code < 400
+        response.content
+    except requests.exceptions.RequestException:
+        ok = False
+    stats[route].record(time.perf_counter() - due, ok)
+
+
+def run_load(target: str, mix: List[Tuple[int, str, str]], rate: float, duration: float,
+             concurrency: int = 64, game_ids: Optional[List[int]] = None,
+             timeout: float = 30, allow_writes: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Drive an open-loop load at a fixed arrival rate.
+
+    Requests are scheduled on a fixed timetable regardless of how quickly earlier
+    ones complete, and timed from their scheduled start, so a slow server shows
+    up as rising latency, not lower load.
+
+    Args:
+        target: Base URL of the app under test
+        mix: Weighted (weight, method, path) route mix
+        rate: Target requests per second
+        duration: Test length in seconds
+        concurrency: Maximum requests in flight
+        game_ids: Game ids substituted into '{id}' paths
+        timeout: Per-request timeout in seconds
+        allow_writes: Keep the POST routes of the mix (they record plays)
+
+    Returns:
+        Summary per route, plus an 'ALL' entry
+    """
+    target = target.rstrip('/')
+    if not allow_writes:
+        mix = [entry for entry in mix if entry[1] != 'POST']
+    game_ids = game_ids or [1000]
+    weights = [w for w, _, _ in mix]
+    stats = {f"{m} {p}": RouteStats() for _, m, p in mix}
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        total = int(rate * duration)
+        for i in range(total):
+            due = started + i / rate
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            _, method, path = random.choices(mix, weights=weights)[0]
+            pool.submit(_issue, target, method, path, game_ids, stats, timeout, due)
+    elapsed = time.perf_counter() - started
+
+    report = {route: s.summary(elapsed) for route, s in stats.items()}
+    overall = RouteStats()
+    for s in stats.values():
+        overall.latencies.extend(s.latencies)
+        overall.errors += s.errors
+    report['ALL'] = overall.summary(elapsed)
+    return report
+
+
+def format_report(report: Dict[str, Dict[str, float]]) -> str:
+    """Render a report as a fixed-width table."""
+    header = f"{'route':<22} {'reqs':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'err %':>7}"
+    lines = [header, '-' * len(header)]
+    for route, s in report.items():
+        lines.append(f"{route:<22} {s['requests']:>7} {s['rps']:>8} {s['p50_ms']:>8} {s['p95_ms']:>8} "
+                     f"{s['p99_ms']:>8} {s['max_ms']:>8} {s['error_rate'] * 100:>7.2f}")
+    return '\n'.join(lines)
+
+
+def _wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"App at {url} did not become ready")
+
+
+def spawn_app(kind: str, api_url: str, port: int) -> subprocess.Popen:
+    """
+    Start the Flask or FastHTML app as a subprocess pointed at the given API.
+
+    Args:
+        kind: 'flask' or 'fasthtml'
+        api_url: Base URL of the (stub) API
+        port: Port for the app to listen on
+    """
+    env = dict(os.environ, EUROGAMES_API_URL=api_url, FLASK_SECRET_KEY=os.environ.get('FLASK_SECRET_KEY', 'loadtest'))
+    if kind == 'flask':
+        cmd = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--with-threads']
+    else:
+        cmd = [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning']
+    here = os.path.dirname(os.path.abspath(__file__))
+    return subprocess.Popen(cmd, cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', help="Base URL of a running app")
+    parser.add_argument('--spawn', choices=('flask', 'fasthtml'), help="Start the stub API and this app locally")
+    parser.add_argument('--app', choices=('flask', 'fasthtml'), help="Route mix to use (default: from --spawn, else flask)")
+    parser.add_argument('--rate', type=float, default=20, help="Requests per second")
+    parser.add_argument('--duration', type=float, default=30, help="Test length in seconds")
+    parser.add_argument('--concurrency', type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument('--port', type=int, default=5077, help="Port for a spawned app")
+    parser.add_argument('--api-latency', type=float, default=0.02, help="Stub API delay per request (seconds)")
+    parser.add_argument('--allow-writes', action='store_true',
+                        help="Send addResult submissions to --target (always on with --spawn)")
+    parser.add_argument('--json', help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    kind = args.app or args.spawn or 'flask'
+    mix = FLASK_MIX if kind == 'flask' else FASTHTML_MIX
+    app_process = None
+    game_ids = None
+
+    if args.spawn:
+        stub = start_stub(latency=args.api_latency)
+        api_url = f"http://127.0.0.1:{stub.server_port}"
+        game_ids = [g['id'] for g in requests.get(api_url + '/v1/games').json()['data']]
+        app_process = spawn_app(args.spawn, api_url, args.port)
+        target = f"http://127.0.0.1:{args.port}"
+    elif args.target:
+        target = args.target
+    else:
+        parser.error("one of --target or --spawn is required")
+
+    try:
+        _wait_until_ready(target + '/')
+        # The spawned stub keeps plays in memory, so writes there are harmless
+        report = run_load(target, mix, args.rate, args.duration, args.concurrency, game_ids,
+                          allow_writes=bool(args.spawn) or args.allow_writes)
+    finally:
+        if app_process is not None:
+            app_process.terminate()
+            app_process.wait()
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if report['ALL']['error_rate'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+Logging for the web apps: lazy, sampled, rate limited and off the request path.
+
+configure_logging() sends every record through a queue to a background
+listener thread, which formats it and writes it to stdout, as text or as one
+JSON object per line (EUROGAMES_LOG_FORMAT=json). Before a record is queued:
+
+- DEBUG and INFO records are sampled per route (EUROGAMES_LOG_SAMPLE, e.g.
+  "/results=0.1,/search=0,*=1"); warnings and errors are always kept.
+- Each logging call site may emit at most EUROGAMES_LOG_RATE records per
+  second. Dropped records are counted, and the count is reported with the
+  next record from that call site that gets through.
+
+Log calls pass their values as arguments (logger.debug("Got %d rows", n)), so
+a message is only built in the listener thread, and only if the record is kept.
+Records whose arguments are not plain values (numbers, strings, None) have
+their message built before they are queued, since the objects may change.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterator, Optional, TextIO
+
+from scheduler import TokenBucket
+from tracing import current_trace_id
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Records waiting for the listener; beyond this they are dropped rather than block a request
+QUEUE_SIZE = 10000
+
+# Longest shutdown waits for room in a full queue to tell the listener to stop
+SHUTDOWN_TIMEOUT = 5.0
+
+# Argument types that cannot change between the log call and formatting in the listener
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+_route: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('log_route', default=None)
+
+# Attributes every LogRecord has; anything else was passed with extra= and goes into JSON output
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+_CONTEXT_ATTRS = {'route', 'trace_id', 'suppressed'}
+
+
+@contextmanager
+def log_route(route: str) -> Iterator[None]:
+    """Tag the records logged inside this block with a route, for sampling and output."""
+    token = _route.set(route)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse 'route=rate,...' (with '*' for the default) into a mapping."""
+    rates = {}
+    for part in spec.split(','):
+        route, _, rate = part.strip().partition('=')
+        if route and rate:
+            rates[route.strip()] = float(rate)
+    return rates
+
+
+class ContextFilter(logging.Filter):
+    """Adds the current route and trace id to each record, before it leaves the request's thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.route = _route.get()
+        record.trace_id = current_trace_id()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of DEBUG and INFO records, set per route."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.default = self.rates.pop('*', 1.0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, 'route', None), self.default)
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+class RateLimitFilter(logging.Filter):
+    """Limits each call site to `rate` records per second (with bursts of `burst`), counting the rest."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self._lock = threading.Lock()
+        self._buckets: Dict[tuple, TokenBucket] = {}
+        self._suppressed: Dict[tuple, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0:
+            return True
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            bucket = self._buckets.get(site)
+            if bucket is None:
+                bucket = self._buckets[site] = TokenBucket(self.rate, self.burst)
+            if bucket.take() > 0:
+                self._suppressed[site] = self._suppressed.get(site, 0) + 1
+                return False
+            suppressed = self._suppressed.pop(site, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queues records without formatting them.
+
+    The standard QueueHandler builds the message before queueing it; here only
+    exception tracebacks are rendered up front (they refer to live frames), and
+    the message is left to the listener unless an argument is a mutable object.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        args = record.args
+        values = args.values() if isinstance(args, dict) else (args or ())
+        if not all(isinstance(value, _IMMUTABLE_ARGS) for value in values):
+            # A list or object could change before the listener formats it: snapshot the message now
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class TextFormatter(logging.Formatter):
+    """The usual one-line text format, noting records suppressed by the rate limit."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{text} ({suppressed} similar suppressed)" if suppressed else text
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including the route, trace id and any extra= fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for attr in ('route', 'trace_id', 'suppressed'):
+            value = getattr(record, attr, None)
+            if value:
+                entry[attr] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in _CONTEXT_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class _Listener(QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of failing."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel, timeout=SHUTDOWN_TIMEOUT)
+
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(level: int = logging.INFO, stream: Optional[TextIO] = None) -> QueueListener:
+    """
+    Route all logging through the background queue, once per process.
+
+    Args:
+        level: Root level unless EUROGAMES_LOG_LEVEL is set
+        stream: Where records are written (default: stdout)
+
+    Returns:
+        The running listener
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+
+        formatter = (JSONFormatter() if os.environ.get('EUROGAMES_LOG_FORMAT', 'text') == 'json'
+                     else TextFormatter(TEXT_FORMAT))
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(formatter)
+
+        handler = DeferredQueueHandler(queue.Queue(QUEUE_SIZE))
+        handler.addFilter(ContextFilter())
+        handler.addFilter(SamplingFilter(parse_sample_rates(os.environ.get('EUROGAMES_LOG_SAMPLE', ''))))
+        handler.addFilter(RateLimitFilter(float(os.environ.get('EUROGAMES_LOG_RATE', 50))))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(os.environ.get('EUROGAMES_LOG_LEVEL', '').upper() or level)
+
+        _listener = _Listener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        # Flush what is queued before the interpreter exits
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the listener thread (safe to call more than once)."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        try:
+            listener.stop()
+        except queue.Full:
+            # The listener is not draining the queue; give up on what is left rather than hang
+            print("Logging queue did not drain at shutdown, some records were lost", file=sys.stderr)
+
+
+def install_request_logging(app) -> None:
+    """
+    Tag the records logged while a Flask app handles a request with its route.
+
+    Args:
+        app: Flask application
+    """
+    from flask import g, request
+
+    @app.before_request
+    def set_log_route():
+        g.log_route_token = _route.set(request.url_rule.rule if request.url_rule else request.path)
+
+    @app.teardown_request
+    def reset_log_route(error=None):
+        token = g.pop('log_route_token', None)
+        if token is not None:
+            try:
+                _route.reset(token)
+            except ValueError:
+                # Streamed responses finish in another context
+                pass
@@ -1,18 +1,65 @@
 # main.py
 
-from fasthtml.common import *
-from api_client import EurogamesAPIClient, APIError
+from fasthtml.components import A, Div, Link, P
+from fasthtml.core import respond, serve
+from fasthtml.fastapp import fast_app
+from fasthtml.xtend import Titled
+from fastcore.xml import NotStr, to_xml
+from starlette.responses import Response, StreamingResponse
+from api_client import APIError
+from async_api_client import AsyncEurogamesAPIClient
+from fast_table import FastTable
+from log_config import configure_logging, log_route
+import asyncio
 import logging
 
 # Initialize API client
-api_client = EurogamesAPIClient()
+api_client = AsyncEurogamesAPIClient()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging goes through a background queue, sampled per route and rate limited (see log_config)
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upstream time budget per route, in seconds
+ROUTE_TIMEOUTS = {'games': 8, 'results': 8, 'lastPlayed': 5, 'winner': 5}
+
+# How often to check whether the browser has aborted the request
+DISCONNECT_POLL = 0.25
+
+
+class RequestAborted(Exception):
+    """The client disconnected before the upstream call finished"""
+
+
+async def fetch(req, call, timeout):
+    """Await an upstream call, cancelling it on timeout or when the HTMX request is aborted"""
+    # The task takes a copy of the context, so the upstream call's records carry the route
+    with log_route(req.url.path):
+        task = asyncio.ensure_future(call)
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise APIError(f"Upstream request timed out after {timeout}s")
+            done, _ = await asyncio.wait({task}, timeout=min(DISCONNECT_POLL, remaining))
+            if done:
+                return task.result()
+            if await req.is_disconnected():
+                raise RequestAborted()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def aborted(req, exc):
+    """Nobody is listening, so send nothing (nginx-style 499)"""
+    return Response(status_code=499)
+
+
 style = Link(rel='stylesheet', href='static/style.css')
-app, rt = fast_app()
+app, rt = fast_app(exception_handlers={RequestAborted: aborted}, on_shutdown=[api_client.aclose])
 
 # Page selector header
 pageSelector = P(
@@ -21,83 +68,109 @@ pageSelector = P(
     A('Last Played', cls='link', hx_get='/lastPlayed', hx_target='#content'),
     A('Winners', cls='link', hx_get='/winner', hx_target='#content'))
 
-"""Make a table row of data from the given responses"""
-def makeRows(data, keys):
-    """Create table rows from data, safely handling missing keys"""
-    rows = []
-    for d in data:
-        row_cells = []
-        for k in keys:
-            value = d.get(k, '') if isinstance(d, dict) else getattr(d, k, '')
-            row_cells.append(Td(value))
-        rows.append(Tr(*row_cells))
-    return rows
+# Tables are specified once; rows are rendered straight to escaped HTML
+gamesTable = FastTable([("Name", 'name'), ("ID", 'id'), ("Status", 'status'), ("Complexity", 'complexity'),
+                        ("Ranking", 'ranking'), ("Played", 'games'), ("Last played", 'lastPlayed')])
+resultsTable = FastTable([("Date", 'date'), ("ID", 'id'), ("Name", 'name'), ("Winner", 'winner'), ("Scores", 'scores')])
+lastPlayedTable = FastTable([("Last played", 'lastPlayed'), ("Days since", 'daysSince'), ("Played", 'games'),
+                             ("Name", 'name')])
+winnerTable = FastTable([("Name", 'name'), ("Played", 'Games'), ("Andrew", 'Andrew'), ("Trish", 'Trish'),
+                         ("Draw", 'Draw'), ("Andrew ratio", 'AndrewRatio')])
 
+# Tables with more rows than this are streamed in chunks
+STREAM_THRESHOLD = 1000
 
-@rt('/')
-def get():
+
+# Stands in for the table when the page shell is rendered around a stream
+TABLE_MARKER = '<!--table-->'
+
+
+def isHtmx(req):
+    """True for HTMX swaps, which take a bare fragment (history restores want the page)"""
+    return 'hx-request' in req.headers and 'hx-history-restore-request' not in req.headers
+
+
+def page(content):
+    """The home page layout with content in place of #content"""
     return Titled("Eurogames",
         pageSelector,
-        Div("Hello", id='content'))
+        Div(content, id='content'))
+
+
+def renderTable(req, table, data):
+    """
+    Render a table in one pass, streaming it when the row count is large.
+    HTMX swaps get the table alone; other requests get it inside the full page.
+    """
+    if len(data) <= STREAM_THRESHOLD:
+        fragment = table.render(data)
+        return fragment if isHtmx(req) else page(fragment)
+    chunks = table.stream(data)
+    if not isHtmx(req):
+        title, body = page(NotStr(TABLE_MARKER))
+        head, tail = to_xml(respond(req, [title], body)).split(TABLE_MARKER)
+        chunks = _wrapped(head, chunks, tail)
+    # Same Vary as FastHTML's own responses, so caches keep the page and fragment apart
+    return StreamingResponse(chunks, media_type='text/html', headers={'vary': 'HX-Request, HX-History-Restore-Request'})
+
+
+def _wrapped(head, chunks, tail):
+    yield head
+    yield from chunks
+    yield tail
+
+
+@rt('/')
+async def get():
+    return page("Hello")
 
 
 @rt('/games')
-def get():
+async def get(req):
     try:
-        games_data = api_client.get_games_list()
-        games = makeRows(games_data, ['name', 'id', 'status', 'complexity', 'ranking', 'games', 'lastPlayed'])
-        return Table(
-            Thead(Tr(Th("Name"), Th("ID"), Th("Status"), Th("Complexity"), Th("Ranking"), Th("Played"), Th("Last played"))),
-            Tbody(*games))
+        games_data = await fetch(req, api_client.get_games_list(), ROUTE_TIMEOUTS['games'])
+        return renderTable(req, gamesTable, games_data)
     except APIError as e:
-        logger.error(f"API error fetching games: {e}")
+        logger.error("API error fetching games: %s", e)
         return P(f"Error loading games: {str(e)}")
 
 
 @rt('/results')
-def get():
+async def get(req):
     try:
-        results_data = api_client.get_played_results()
-        results = makeRows(results_data, ['date', 'id', 'name', 'winner', 'scores'])
-        return Table(
-            Thead(Tr(Th("Date"), Th("ID"), Th("Name"), Th("Winner"), Th("Scores"))),
-            Tbody(*results))
+        results_data = await fetch(req, api_client.get_played_results(), ROUTE_TIMEOUTS['results'])
+        return renderTable(req, resultsTable, results_data)
     except APIError as e:
-        logger.error(f"API error fetching results: {e}")
+        logger.error("API error fetching results: %s", e)
         return P(f"Error loading results: {str(e)}")
 
 
 @rt('/lastPlayed')
-def get():
+async def get(req):
     try:
-        games_data = api_client.get_last_played()
-        resp = makeRows(games_data, ['lastPlayed', 'daysSince', 'games', 'name'])
-        return Table(
-            Thead(Tr(Th("Last played"), Th("Days since"), Th("Played"), Th("Name"))),
-            Tbody(*resp))
+        games_data = await fetch(req, api_client.get_last_played(), ROUTE_TIMEOUTS['lastPlayed'])
+        return renderTable(req, lastPlayedTable, games_data)
     except APIError as e:
-        logger.error(f"API error fetching last played: {e}")
+        logger.error("API error fetching last played: %s", e)
         return P(f"Error loading last played games: {str(e)}")
 
 
 @rt('/winner')
-def get():
+async def get(req):
     try:
-        games_data = api_client.get_winner_stats()
+        games_data = await fetch(req, api_client.get_winner_stats(), ROUTE_TIMEOUTS['winner'])
         # Add calculated ratio if not provided by API
         for game in games_data:
             if 'AndrewRatio' not in game and 'Andrew' in game and 'Games' in game:
                 if game['Games'] > 0:
                     game['AndrewRatio'] = round(100 * float(game['Andrew']) / game['Games'], 1)
-        resp = makeRows(games_data, ['name', 'Games', 'Andrew', 'Trish', 'Draw', 'AndrewRatio'])
-        return Table(
-            Thead(Tr(Th("Name"), Th("Played"), Th("Andrew"), Th("Trish"), Th("Draw"), Td("Andrew ratio"))),
-            Tbody(*resp))
+        return renderTable(req, winnerTable, games_data)
     except APIError as e:
-        logger.error(f"API error fetching winner stats: {e}")
+        logger.error("API error fetching winner stats: %s", e)
         return P(f"Error loading winner statistics: {str(e)}")
 
 
-serve()
+if __name__ == '__main__':
+    serve()
 
 # The End
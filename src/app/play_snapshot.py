@@ -0,0 +1,219 @@
+"""
+Memory-mappable binary snapshot of the play log for analytics.
+
+Layout (little-endian):
+    header    64 bytes: magic b'EGPS', version, record count, and offsets/lengths
+              of the metadata, records, string offsets and string data sections
+    metadata  JSON {winners: [...], created}
+    records   fixed-width rows: date ordinal (i4), game id (i4), name string (i4),
+              scores string (i4), winner code (u1), padding (3)
+    strings   u64 offsets (count + 1) followed by UTF-8 data; strings are interned
+
+Readers map the file and expose the records as NumPy arrays without copying,
+so loading is independent of log size and processes share the same pages.
+
+Usage:
+    python play_snapshot.py write <file>     # snapshot the log from the API
+    python play_snapshot.py info <file>
+"""
+
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+MAGIC = b'EGPS'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIQQQQQQQ')
+ALIGN = 64
+
+RECORD_DTYPE = np.dtype([
+    ('date', '<i4'),
+    ('game_id', '<i4'),
+    ('name', '<i4'),
+    ('scores', '<i4'),
+    ('winner', 'u1'),
+    ('_pad', 'V3'),
+])
+
+# Offset between proleptic Gregorian ordinals and numpy's datetime64 epoch
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_snapshot(path: str, plays: Iterable[Dict[str, Any]]) -> int:
+    """
+    Materialize plays into a snapshot file, replacing any previous snapshot atomically.
+
+    Args:
+        path: Output file
+        plays: Play rows with 'date' (YYYY-MM-DD), 'id' (not None), 'winner', and optional 'name' and 'scores'
+
+    Returns:
+        Number of plays written
+    """
+    strings: List[str] = ['']
+    string_ids: Dict[str, int] = {'': 0}
+    winners: List[str] = []
+    winner_ids: Dict[str, int] = {}
+
+    def intern(s: Optional[str]) -> int:
+        s = s or ''
+        if s not in string_ids:
+            string_ids[s] = len(strings)
+            strings.append(s)
+        return string_ids[s]
+
+    rows = []
+    for play in plays:
+        winner = play.get('winner') or ''
+        if winner not in winner_ids:
+            if len(winners) == 255:
+                raise ValueError("Too many distinct winner values for a one-byte code")
+            winner_ids[winner] = len(winners)
+            winners.append(winner)
+        rows.append((datetime.date.fromisoformat(play['date'][:10]).toordinal(), int(play['id']),
+                     intern(play.get('name')), intern(play.get('scores')), winner_ids[winner], b''))
+    records = np.array(rows, dtype=RECORD_DTYPE)
+
+    encoded = [s.encode() for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    meta = json.dumps({'winners': winners, 'created': time.strftime('%Y-%m-%dT%H:%M:%S')}).encode()
+
+    meta_offset = HEADER.size
+    records_offset = _align(meta_offset + len(meta))
+    offsets_offset = _align(records_offset + records.nbytes)
+    data_offset = offsets_offset + offsets.nbytes
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records), meta_offset, len(meta), records_offset,
+                            offsets_offset, len(encoded), data_offset))
+        f.write(meta)
+        f.write(b'\0' * (records_offset - f.tell()))
+        f.write(records.tobytes())
+        f.write(b'\0' * (offsets_offset - f.tell()))
+        f.write(offsets.tobytes())
+        for b in encoded:
+            f.write(b)
+    # Readers that already mapped the old file keep their pages
+    os.replace(tmp, path)
+    return len(records)
+
+
+class PlaySnapshot:
+    """Read-only, zero-copy view of a snapshot file."""
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file.
+
+        Args:
+            path: Snapshot written by write_snapshot()
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version
+        """
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, count, meta_offset, meta_len, records_offset, offsets_offset, string_count,
+         data_offset) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} play snapshot")
+
+        self.meta = json.loads(self._mmap[meta_offset:meta_offset + meta_len])
+        self.winner_names: List[str] = self.meta['winners']
+        self.records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=count, offset=records_offset)
+        self._offsets = np.frombuffer(self._mmap, dtype='<u8', count=string_count + 1, offset=offsets_offset)
+        self._data_offset = data_offset
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Play dates as proleptic Gregorian ordinals (a view, no copy)."""
+        return self.records['date']
+
+    @property
+    def game_ids(self) -> np.ndarray:
+        """Game ids (a view, no copy)."""
+        return self.records['game_id']
+
+    @property
+    def winners(self) -> np.ndarray:
+        """Winner codes indexing winner_names (a view, no copy)."""
+        return self.records['winner']
+
+    def dates64(self) -> np.ndarray:
+        """Play dates as datetime64[D] (computed, so this one copies)."""
+        return (self.dates - _EPOCH_ORDINAL).astype('datetime64[D]')
+
+    def winner_code(self, name: str) -> int:
+        """Return the code for a winner name, for filtering e.g. snapshot.winners == code."""
+        return self.winner_names.index(name)
+
+    def string(self, index: int) -> str:
+        """Decode one entry of the string table."""
+        start = self._data_offset + int(self._offsets[index])
+        end = self._data_offset + int(self._offsets[index + 1])
+        return self._mmap[start:end].decode()
+
+    def name(self, row: int) -> str:
+        """Game name for a record."""
+        return self.string(int(self.records['name'][row]))
+
+    def scores(self, row: int) -> str:
+        """Scores text for a record."""
+        return self.string(int(self.records['scores'][row]))
+
+    def close(self) -> None:
+        """
+        Release the mapping.
+
+        Arrays taken from this snapshot (dates, game_ids, winners, records) are
+        views of the mapping. While any are still referenced the file stays
+        mapped until they are garbage collected; copy them first (np.array(...))
+        to keep them beyond close().
+        """
+        # Drop our own array views before unmapping
+        self.records = self._offsets = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a view; the mapping is released with the last one
+            pass
+
+
+def plays_from_export(export: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Join exported log rows with bgg names, skipping rows with no date or game id."""
+    names = {g.get('id'): g.get('name') for g in export.get('bgg', [])}
+    return [dict(p, name=names.get(p['id'])) for p in export.get('log', [])
+            if p.get('date') and p.get('id') is not None]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == 'write':
+        from api_client import EurogamesAPIClient
+        count = write_snapshot(sys.argv[2], plays_from_export(EurogamesAPIClient().export_data()))
+        print(f"Wrote {count} plays to {sys.argv[2]}")
+    elif len(sys.argv) == 3 and sys.argv[1] == 'info':
+        started = time.perf_counter()
+        snapshot = PlaySnapshot(sys.argv[2])
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{len(snapshot)} plays, winners {snapshot.winner_names}, loaded in {elapsed:.2f} ms")
+        for code, name in enumerate(snapshot.winner_names):
+            print(f"  {name}: {int(np.count_nonzero(snapshot.winners == code))}")
+    else:
+        print(f"Usage: {sys.argv[0]} write <file> | info <file>")
+        sys.exit(1)
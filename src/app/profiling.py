@@ -0,0 +1,252 @@
+"""
+On-demand profiling of single Flask requests.
+
+Off unless EUROGAMES_PROFILE_TOKEN is set. A request carrying that token in
+an ``X-Profile-Token`` header, plus an ``X-Profile`` header or a ``profile``
+query parameter, is run under a profiler. The capture is written to disk and
+listed at ``/_profiles`` (which needs the token too). Other requests pass
+straight through.
+
+Modes:
+    sample   - stack sampling, exported as folded stacks (flamegraph.pl, speedscope)
+    cprofile - deterministic cProfile, exported as a pstats file (snakeviz, flameprof)
+
+Only one cProfile profiler can run at a time, so a cprofile request that
+arrives while another is being profiled is sampled instead.
+"""
+
+import cProfile
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qsl
+
+from flask import abort, jsonify, request, send_from_directory
+
+logger = logging.getLogger(__name__)
+
+MODES = ('sample', 'cprofile')
+
+_PROFILE_PARAM = re.compile(r'(?:^|&)profile(?:=([^&]*))?(?:&|$)')
+
+
+class StackSampler:
+    """Samples one thread's call stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def __enter__(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Return samples in folded-stack format, one 'frame;frame count' line per stack."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """WSGI middleware that profiles individual requests when asked to."""
+
+    def __init__(self, wsgi_app, output_dir: str, token: str, allowed: Optional[Iterable[str]] = None,
+                 keep: int = 50, interval: float = 0.001):
+        """
+        Args:
+            wsgi_app: The wrapped WSGI application
+            output_dir: Directory that captures are written to
+            token: Secret a request must send in X-Profile-Token to be profiled
+            allowed: Client addresses also required to match (default: any)
+            keep: Number of recent captures retained on disk
+            interval: Sampling interval in seconds for 'sample' mode
+        """
+        if not token:
+            raise ValueError("A profiling token is required")
+        self.app = wsgi_app
+        self.output_dir = output_dir
+        self.token = token
+        self.allowed = set(allowed) if allowed else None
+        self.keep = keep
+        self.interval = interval
+        # cProfile cannot run two profilers at once
+        self._cprofile_lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def authorized(self, token: Optional[str], remote_addr: Optional[str]) -> bool:
+        """Whether a client sending this token from this address may profile and read captures."""
+        if not token or not hmac.compare_digest(token.encode(), self.token.encode()):
+            return False
+        return self.allowed is None or remote_addr in self.allowed
+
+    def _requested_mode(self, environ) -> Optional[str]:
+        """Return the requested profiling mode, or None if the request is not to be profiled."""
+        mode = environ.get('HTTP_X_PROFILE')
+        if mode is None:
+            query = environ.get('QUERY_STRING', '')
+            if 'profile' not in query:
+                return None
+            match = _PROFILE_PARAM.search(query)
+            if match is None:
+                return None
+            mode = match.group(1)
+        if not self.authorized(environ.get('HTTP_X_PROFILE_TOKEN'), environ.get('REMOTE_ADDR')):
+            return None
+        return mode if mode in MODES else 'sample'
+
+    def __call__(self, environ, start_response):
+        mode = self._requested_mode(environ)
+        if mode is None:
+            return self.app(environ, start_response)
+        return self._profile(mode, environ, start_response)
+
+    def _profile(self, mode: str, environ, start_response) -> List[bytes]:
+        name = time.strftime('%Y%m%d-%H%M%S') + f"-{int(time.time() * 1000) % 1000:03d}-" + \
+            re.sub(r'[^A-Za-z0-9]+', '_', environ.get('PATH_INFO', '/')).strip('_')
+        captured = {}
+
+        def capture_start(status, headers, exc_info=None):
+            captured['status'] = status
+            return start_response(status, headers + [('X-Profile-Id', name)], exc_info)
+
+        if mode == 'cprofile' and not self._cprofile_lock.acquire(blocking=False):
+            logger.info("A cprofile capture is already running, sampling %s instead", environ.get('PATH_INFO'))
+            mode = 'sample'
+
+        started = time.perf_counter()
+        if mode == 'cprofile':
+            try:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    body = self._drain(self.app(environ, capture_start))
+                finally:
+                    profiler.disable()
+            finally:
+                self._cprofile_lock.release()
+            filename = name + '.pstats'
+            profiler.dump_stats(os.path.join(self.output_dir, filename))
+        else:
+            with StackSampler(threading.get_ident(), self.interval) as sampler:
+                body = self._drain(self.app(environ, capture_start))
+            filename = name + '.folded'
+            with open(os.path.join(self.output_dir, filename), 'w') as f:
+                f.write(sampler.folded())
+        elapsed = time.perf_counter() - started
+
+        meta = {
+            'id': name,
+            'file': filename,
+            'mode': mode,
+            'method': environ.get('REQUEST_METHOD'),
+            'path': environ.get('PATH_INFO'),
+            # Parameter names only: values may hold search terms or other user input
+            'params': sorted({key for key, _ in parse_qsl(environ.get('QUERY_STRING', ''), keep_blank_values=True)}),
+            'status': captured.get('status'),
+            'duration_ms': round(elapsed * 1000, 2),
+            'created': time.time(),
+        }
+        with open(os.path.join(self.output_dir, name + '.json'), 'w') as f:
+            json.dump(meta, f)
+        logger.info("Profiled %s %s in %s ms -> %s", meta['method'], meta['path'], meta['duration_ms'], filename)
+        self._prune()
+        return body
+
+    @staticmethod
+    def _drain(result) -> List[bytes]:
+        """Consume the whole response inside the profiler so streamed bodies are included."""
+        try:
+            return [b''.join(result)]
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    def captures(self) -> List[dict]:
+        """Return metadata for retained captures, newest first."""
+        metas = []
+        for entry in os.listdir(self.output_dir):
+            if entry.endswith('.json'):
+                try:
+                    with open(os.path.join(self.output_dir, entry)) as f:
+                        metas.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return sorted(metas, key=lambda m: m.get('created', 0), reverse=True)
+
+    def _prune(self) -> None:
+        """Delete captures beyond the retention limit."""
+        for meta in self.captures()[self.keep:]:
+            for filename in (meta['file'], meta['id'] + '.json'):
+                try:
+                    os.remove(os.path.join(self.output_dir, filename))
+                except OSError:
+                    pass
+
+
+def install_profiler(app, output_dir: Optional[str] = None, token: Optional[str] = None,
+                     allowed: Optional[Iterable[str]] = None) -> Optional[RequestProfiler]:
+    """
+    Wrap a Flask app with RequestProfiler and register the capture index routes.
+
+    Nothing is installed unless a token is given or EUROGAMES_PROFILE_TOKEN is set.
+
+    Args:
+        app: Flask application
+        output_dir: Capture directory (default EUROGAMES_PROFILE_DIR, or a temp directory)
+        token: Secret clients send in X-Profile-Token (default EUROGAMES_PROFILE_TOKEN)
+        allowed: Client addresses also required to match (default EUROGAMES_PROFILE_ALLOW, or any)
+
+    Returns:
+        The installed middleware, or None if profiling is off
+    """
+    token = token or os.environ.get('EUROGAMES_PROFILE_TOKEN')
+    if not token:
+        return None
+    output_dir = output_dir or os.environ.get('EUROGAMES_PROFILE_DIR') or \
+        os.path.join(tempfile.gettempdir(), 'eurogames-profiles')
+    if allowed is None:
+        env_allowed = os.environ.get('EUROGAMES_PROFILE_ALLOW')
+        allowed = [a.strip() for a in env_allowed.split(',')] if env_allowed else None
+    profiler = RequestProfiler(app.wsgi_app, output_dir, token, allowed)
+    app.wsgi_app = profiler
+
+    def check_client():
+        if not profiler.authorized(request.headers.get('X-Profile-Token'), request.remote_addr):
+            abort(403)
+
+    @app.route('/_profiles')
+    def profile_index():
+        check_client()
+        return jsonify(profiler.captures())
+
+    @app.route('/_profiles/<path:filename>')
+    def profile_file(filename):
+        check_client()
+        return send_from_directory(profiler.output_dir, filename, as_attachment=True)
+
+    return profiler
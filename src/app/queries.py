@@ -0,0 +1,167 @@
+"""
+Named SQL queries run through the API's POST /v1/query endpoint.
+
+Queries come from the .sql files under data/queries (named by their relative
+path without the extension, e.g. 'games/winners') and from the saved_queries
+table. Parameters use SQLite's ':name' style and are always sent separately
+from the SQL text, never interpolated into it.
+"""
+
+import hashlib
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+QUERY_DIR = os.environ.get(
+    'EUROGAMES_QUERY_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'queries'))
+
+_IDENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+# Statements that change the database, anywhere in the query (a CTE can precede
+# INSERT/UPDATE/DELETE). replace() the string function is still allowed.
+_WRITE = re.compile(r'\b(?:INSERT|UPDATE|DELETE|CREATE|DROP|ALTER|ATTACH|DETACH|PRAGMA|VACUUM|REINDEX)\b'
+                    r'|\bREPLACE\b(?!\s*\()', re.IGNORECASE)
+_SCALARS = (str, int, float, bool, type(None))
+
+Params = Optional[Union[Dict[str, Any], Sequence[Any]]]
+
+
+class QueryError(Exception):
+    """Exception raised for unknown queries, unsafe SQL or bad parameters."""
+    pass
+
+
+def _tokens(sql: str):
+    """
+    Yield (kind, text) pieces of a SQL string: 'literal' for quoted strings and
+    identifiers, 'comment', 'param' for ':name' placeholders, and 'code' otherwise.
+    """
+    i, n, start = 0, len(sql), 0
+    while i < n:
+        c = sql[i]
+        if c in ("'", '"', '`', '['):
+            close = ']' if c == '[' else c
+            j = i + 1
+            while j < n:
+                if sql[j] == close:
+                    # A doubled quote is an escaped quote
+                    if close != ']' and j + 1 < n and sql[j + 1] == close:
+                        j += 2
+                        continue
+                    break
+                j += 1
+            kind, end = 'literal', min(j + 1, n)
+        elif sql.startswith('--', i):
+            j = sql.find('\n', i)
+            kind, end = 'comment', n if j < 0 else j
+        elif sql.startswith('/*', i):
+            j = sql.find('*/', i + 2)
+            kind, end = 'comment', n if j < 0 else j + 2
+        elif c == ':' and _IDENT.match(sql, i + 1):
+            kind, end = 'param', _IDENT.match(sql, i + 1).end()
+        else:
+            i += 1
+            continue
+        if start < i:
+            yield 'code', sql[start:i]
+        yield kind, sql[i:end]
+        i = start = end
+    if start < n:
+        yield 'code', sql[start:]
+
+
+def normalize_sql(sql: str) -> str:
+    """Strip comments, collapse whitespace and drop a trailing semicolon."""
+    parts, code = [], []
+    for kind, text in _tokens(sql):
+        if kind in ('code', 'comment'):
+            code.append(' ' if kind == 'comment' else text)
+            continue
+        parts.append(re.sub(r'\s+', ' ', ''.join(code)))
+        parts.append(text)
+        code = []
+    parts.append(re.sub(r'\s+', ' ', ''.join(code)))
+    return ''.join(parts).strip().rstrip(';').strip()
+
+
+def sql_hash(sql: str) -> str:
+    """Stable hash of a query's normalized text."""
+    return hashlib.sha256(normalize_sql(sql).encode()).hexdigest()[:32]
+
+
+def bind(sql: str, params: Params = None) -> Tuple[str, List[Any]]:
+    """
+    Check a query and convert it to positional placeholders.
+
+    Args:
+        sql: A single SELECT (or WITH ... SELECT) statement, with ':name' or '?' placeholders
+        params: Mapping for ':name' placeholders, or a sequence for '?' placeholders
+
+    Returns:
+        Normalized SQL using '?' placeholders, and the values in placeholder order
+
+    Raises:
+        QueryError: If the SQL is not a single read-only statement or the parameters do not match
+    """
+    sql = normalize_sql(sql)
+    first = sql.split(None, 1)[0].upper() if sql else ''
+    if first not in ('SELECT', 'WITH'):
+        raise QueryError("Only SELECT queries can be run")
+
+    out, names = [], []
+    for kind, text in _tokens(sql):
+        if kind == 'code' and ';' in text:
+            raise QueryError("Only a single statement can be run")
+        if kind == 'code':
+            write = _WRITE.search(text)
+            if write:
+                raise QueryError(f"Only SELECT queries can be run (found {write.group(0).upper()})")
+        if kind == 'param':
+            names.append(text[1:])
+            out.append('?')
+        else:
+            out.append(text)
+    bound_sql = ''.join(out)
+
+    if names:
+        if not isinstance(params, dict):
+            raise QueryError(f"Query expects named parameters: {', '.join(sorted(set(names)))}")
+        missing = set(names) - set(params)
+        if missing:
+            raise QueryError(f"Missing query parameters: {', '.join(sorted(missing))}")
+        values = [params[name] for name in names]
+    else:
+        values = list(params or [])
+        if isinstance(params, dict) and params:
+            raise QueryError("Query has no named parameters")
+        expected = sum(text.count('?') for kind, text in _tokens(bound_sql) if kind == 'code')
+        if len(values) != expected:
+            raise QueryError(f"Query expects {expected} parameters, got {len(values)}")
+
+    for value in values:
+        if not isinstance(value, _SCALARS):
+            raise QueryError(f"Unsupported parameter type: {type(value).__name__}")
+    return bound_sql, values
+
+
+def paged(sql: str) -> str:
+    """Wrap bound SQL so it returns one page; LIMIT and OFFSET are appended as parameters."""
+    return f"SELECT * FROM ({sql}) LIMIT ? OFFSET ?"
+
+
+def load_query_files(root: str = QUERY_DIR) -> Dict[str, str]:
+    """
+    Load every .sql file under a directory.
+
+    Returns:
+        Mapping of query name (relative path without '.sql', '/'-separated) to SQL text
+    """
+    queries = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if filename.endswith('.sql'):
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, root)[:-4].replace(os.sep, '/')
+                with open(path) as f:
+                    queries[name] = f.read()
+    return queries
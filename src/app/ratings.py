@@ -0,0 +1,362 @@
+"""
+Elo player ratings over the play log, overall and per game.
+
+The log records only the winner of each play, so every play is scored between
+all players on the roster: the winner beats each of the others (the losers are
+not ranked against one another), and a draw is a draw between all of them.
+With more than two players the K factor is shared out over the pairings, so a
+play moves a rating by at most K.
+
+Ratings are built once from the whole log, in the background on first use,
+then updated per new play: from add_game_result straight away, and from the
+log (by rowid) for plays recorded elsewhere. Plays without a game id or a
+winner are skipped, as in the game_stats tables (migration 0003). The state,
+including each scope's rating history, is checkpointed to a JSON file so a
+restart only replays plays added since.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+# Scope of the ratings over all games; per-game scopes are the game ids
+OVERALL = '*'
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """Expected score (0-1) of a player against an opponent."""
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+def _play_key(play: Dict[str, Any]) -> Tuple:
+    # The columns of the log's unique index (migration 0004)
+    return (play.get('date'), int(play.get('id')), play.get('winner'), play.get('scores') or '',
+            play.get('comment') or '')
+
+
+class EloRatings:
+    """Elo ratings of a roster of players, overall and per game, with their history."""
+
+    def __init__(self, players: Optional[Iterable[str]] = None, k: float = 32.0, initial: float = 1500.0,
+                 draw: str = 'Draw'):
+        """
+        Args:
+            players: Roster scored in every play (default: every winner name seen in the log)
+            k: Most a rating can move in one play
+            initial: Rating of a player before their first play
+            draw: Winner value recorded for a draw
+        """
+        self.players: List[str] = list(players or [])
+        self.fixed_roster = bool(self.players)
+        self.k = k
+        self.initial = initial
+        self.draw = draw
+        self.ratings: Dict[str, Dict[str, float]] = {}
+        self.plays: Dict[str, int] = {}
+        self.history: Dict[str, List[List[Any]]] = {}
+        self.names: Dict[str, str] = {}
+        self.last_rowid = 0
+        # Plays applied from add_game_result, not yet seen in the log
+        self._pending: set = set()
+
+    def settings(self) -> Dict[str, Any]:
+        """The parameters a checkpoint must have been built with to be reused."""
+        return {'players': self.players if self.fixed_roster else None, 'k': self.k, 'initial': self.initial,
+                'draw': self.draw}
+
+    def apply(self, play: Dict[str, Any]) -> bool:
+        """
+        Score one play (with 'date', 'id' and 'winner'; 'rowid' when read from the log).
+
+        Plays from the log are applied in rowid order and each only once, including
+        those already applied when they were recorded. Plays with no game id or
+        no winner are skipped.
+
+        Returns:
+            True if the ratings changed
+        """
+        rowid = play.get('rowid')
+        if play.get('id') is None or play.get('winner') is None:
+            if rowid is not None:
+                self.last_rowid = max(self.last_rowid, rowid)
+            return False
+        key = _play_key(play)
+        if play.get('name'):
+            self.names[str(play['id'])] = play['name']
+        if rowid is not None:
+            if rowid <= self.last_rowid:
+                return False
+            self.last_rowid = rowid
+            if key in self._pending:
+                self._pending.discard(key)
+                return False
+        else:
+            self._pending.add(key)
+
+        winner = play.get('winner')
+        if winner != self.draw and winner not in self.players:
+            if self.fixed_roster:
+                logger.warning("Skipping play on %s: %s is not on the roster", play.get('date'), winner)
+                return False
+            self.players.append(winner)
+        if len(self.players) < 2:
+            return False
+        for scope in (OVERALL, str(play['id'])):
+            self._score(scope, winner, play.get('date'))
+        return True
+
+    def _score(self, scope: str, winner: str, date: str) -> None:
+        ratings = self.ratings.setdefault(scope, {})
+        for player in self.players:
+            ratings.setdefault(player, self.initial)
+        k = self.k / (len(self.players) - 1)
+        deltas = dict.fromkeys(self.players, 0.0)
+        for i, a in enumerate(self.players):
+            for b in self.players[i + 1:]:
+                if winner == self.draw:
+                    score = 0.5
+                elif winner == a:
+                    score = 1.0
+                elif winner == b:
+                    score = 0.0
+                else:
+                    continue
+                change = k * (score - expected_score(ratings[a], ratings[b]))
+                deltas[a] += change
+                deltas[b] -= change
+        for player, delta in deltas.items():
+            ratings[player] += delta
+        self.plays[scope] = self.plays.get(scope, 0) + 1
+        self.history.setdefault(scope, []).append(
+            [date, {player: round(rating, 1) for player, rating in ratings.items()}])
+
+    def standings(self, scope: str = OVERALL) -> List[Dict[str, Any]]:
+        """Players by rating, highest first."""
+        ratings = self.ratings.get(scope, {})
+        return [{'player': player, 'rating': round(rating, 1)}
+                for player, rating in sorted(ratings.items(), key=lambda item: item[1], reverse=True)]
+
+    def series(self, scope: str = OVERALL) -> List[Dict[str, Any]]:
+        """Rating history as one point per player per play: date, player and rating."""
+        return [{'date': date, 'player': player, 'rating': rating}
+                for date, ratings in self.history.get(scope, []) for player, rating in ratings.items()]
+
+    def games(self) -> List[Dict[str, Any]]:
+        """Per-game ratings: id, name, plays and each player's rating, by name."""
+        rows = []
+        for scope, ratings in self.ratings.items():
+            if scope == OVERALL:
+                continue
+            rows.append({'id': scope, 'name': self.names.get(scope), 'plays': self.plays.get(scope, 0),
+                         'ratings': {player: round(rating, 1) for player, rating in ratings.items()}})
+        return sorted(rows, key=lambda row: row['name'] or '')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'settings': self.settings(), 'players': self.players, 'ratings': self.ratings, 'plays': self.plays,
+                'history': self.history, 'names': self.names, 'last_rowid': self.last_rowid,
+                'pending': [list(key) for key in self._pending]}
+
+    def load_dict(self, state: Dict[str, Any]) -> None:
+        self.players = state['players']
+        self.ratings = state['ratings']
+        self.plays = state['plays']
+        self.history = state['history']
+        self.names = state['names']
+        self.last_rowid = state['last_rowid']
+        self._pending = {tuple(key) for key in state.get('pending', [])}
+
+
+class PlayerRatings:
+    """Keeps EloRatings in step with the play log through the API client, with a checkpoint file."""
+
+    def __init__(self, get_client: Callable[[], Any], ratings: EloRatings, path: Optional[str] = None,
+                 sync_interval: float = 30.0, save_interval: float = 60.0, batch: int = 1000):
+        """
+        Args:
+            get_client: Returns the EurogamesAPIClient to read the log through
+            ratings: Engine (its settings must match a checkpoint for it to be reused)
+            path: Checkpoint file (default: none; ratings are rebuilt on every start)
+            sync_interval: Seconds between checks of the log for plays recorded elsewhere
+            save_interval: Least seconds between checkpoint writes (one is also written at exit)
+            batch: Plays read per request
+        """
+        self.get_client = get_client
+        self.ratings = ratings
+        self.path = path
+        self.sync_interval = sync_interval
+        self.save_interval = save_interval
+        self.batch = batch
+        self._lock = threading.RLock()
+        self._ready = False
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._version = None
+        self._synced = 0.0
+        self._saved = 0.0
+        self._dirty = False
+        if path:
+            atexit.register(self.save)
+
+    def _plays_since(self, rowid: int) -> Iterable[Dict[str, Any]]:
+        client = self.get_client()
+        while True:
+            rows = client.run_query('games/plays-since', {'rowid': rowid, 'limit': self.batch}, fresh=True)
+            yield from rows
+            if len(rows) < self.batch:
+                return
+            rowid = rows[-1]['rowid']
+
+    def _stamp(self) -> Dict[str, Any]:
+        return {'base_url': self.get_client().base_url, **self.ratings.settings()}
+
+    def _load(self) -> bool:
+        """Restore the checkpoint, if there is one for this API and these settings."""
+        if not self.path:
+            return False
+        try:
+            with open(self.path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable ratings checkpoint %s: %s", self.path, e)
+            return False
+        if checkpoint.get('format') != FORMAT_VERSION or checkpoint.get('stamp') != self._stamp():
+            logger.info("Ratings checkpoint was built for other data or settings, rebuilding")
+            return False
+        latest = self.get_client().run_query('games/latest-play', fresh=True)[0]['rowid']
+        if latest < checkpoint['state']['last_rowid']:
+            logger.info("Play log is older than the ratings checkpoint, rebuilding")
+            return False
+        self.ratings.load_dict(checkpoint['state'])
+        logger.info("Loaded ratings checkpoint %s at play %s", self.path, self.ratings.last_rowid)
+        return True
+
+    def build(self) -> int:
+        """Rate the whole log from scratch, returning the number of plays scored."""
+        with self._lock:
+            plays = list(self._plays_since(0))
+            fresh = EloRatings(**self.ratings.settings())
+            if not fresh.fixed_roster:
+                # Everyone who has ever won takes part from the first play
+                fresh.players = list(dict.fromkeys(
+                    p['winner'] for p in plays
+                    if p.get('id') is not None and p.get('winner') is not None and p['winner'] != fresh.draw))
+            scored = sum(fresh.apply(play) for play in plays)
+            self.ratings = fresh
+            self._dirty = True
+            logger.info("Built ratings from %d plays", len(plays))
+            self.save()
+            return scored
+
+    @property
+    def ready(self) -> bool:
+        """Whether the ratings have been loaded or built."""
+        return self._ready
+
+    def start(self) -> None:
+        """Load or build the ratings in a background thread, if that has not started yet."""
+        with self._start_lock:
+            if self._ready or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(target=self._prepare, name='ratings-build', daemon=True)
+            self._thread.start()
+
+    def _prepare(self) -> None:
+        try:
+            with self._lock:
+                if not self._load():
+                    self.build()
+                self.sync(force=True)
+                self._ready = True
+        except Exception as e:
+            # The next ensure() tries again
+            logger.warning("Could not build ratings: %s", e, exc_info=True)
+
+    def ensure(self, wait: Optional[float] = None) -> None:
+        """
+        Start loading or building the ratings on first use, then pick up any new plays.
+
+        Args:
+            wait: Seconds to wait for a first build to finish (default: do not wait)
+        """
+        if not self._ready:
+            self.start()
+            if wait and self._thread is not None:
+                self._thread.join(wait)
+            return
+        self.sync()
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Score plays added to the log since the last sync.
+
+        Unless forced, the log is only read when the data version has moved or
+        sync_interval has passed. Returns the number of plays scored.
+        """
+        with self._lock:
+            version = self.get_client().data_version()
+            if not force and version == self._version and time.monotonic() - self._synced < self.sync_interval:
+                return 0
+            self._version = version
+            self._synced = time.monotonic()
+            scored = sum(self.ratings.apply(play) for play in self._plays_since(self.ratings.last_rowid))
+            if scored:
+                self._dirty = True
+                logger.info("Scored %d new plays", scored)
+            self._maybe_save()
+            return scored
+
+    def view(self, scope: str = OVERALL) -> Dict[str, Any]:
+        """
+        Standings and rating history of one scope (with the per-game table for OVERALL).
+
+        While the ratings are still being built, the view is empty and 'building' is True.
+        """
+        if not self._ready:
+            return {'building': True, 'standings': [], 'series': [], 'players': [], 'plays': 0, 'name': None,
+                    'initial': self.ratings.initial, 'games': []}
+        with self._lock:
+            return {'building': False, 'standings': self.ratings.standings(scope),
+                    'series': self.ratings.series(scope), 'players': list(self.ratings.players),
+                    'plays': self.ratings.plays.get(scope, 0), 'name': self.ratings.names.get(scope),
+                    'initial': self.ratings.initial, 'games': self.ratings.games() if scope == OVERALL else []}
+
+    def record(self, play: Dict[str, Any]) -> None:
+        """Score a play just recorded by add_game_result, without reading the log."""
+        # Until the ratings are ready the build picks the play up from the log
+        if not self._ready:
+            return
+        with self._lock:
+            if self.ratings.apply(play):
+                self._dirty = True
+                self._maybe_save()
+
+    def _maybe_save(self) -> None:
+        if time.monotonic() - self._saved >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Write the checkpoint atomically, if anything changed since the last write."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            checkpoint = {'format': FORMAT_VERSION, 'stamp': self._stamp(), 'saved_at': time.time(),
+                          'state': self.ratings.to_dict()}
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp, 'w') as f:
+                    json.dump(checkpoint, f, separators=(',', ':'))
+                os.replace(tmp, self.path)
+                self._dirty = False
+                self._saved = time.monotonic()
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning("Could not save ratings checkpoint %s: %s", self.path, e)
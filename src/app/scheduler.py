@@ -0,0 +1,158 @@
+"""
+Priority-aware, rate-limited scheduling of upstream API requests.
+
+Every request the client sends takes a slot from the scheduler first. Slots are
+granted in priority order (interactive > write > background), subject to a
+global token-bucket rate limit and a concurrency cap per class, so bulk jobs
+cannot starve page loads or push the Worker over its limits.
+
+The class of a request comes from the innermost ``request_priority()`` block,
+or defaults to 'interactive' for reads and 'write' for writes.
+"""
+
+import bisect
+import contextvars
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+PRIORITIES = ('interactive', 'write', 'background')
+
+DEFAULT_CAPS = {'interactive': 16, 'write': 4, 'background': 2}
+
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_priority', default=None)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """Send the API requests made inside this block with the given priority class."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority '{priority}' (use one of {', '.join(PRIORITIES)})")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: str = 'interactive') -> str:
+    """Return the priority class set by the innermost request_priority() block."""
+    return _priority.get() or default
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until one will be."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _ClassStats:
+    def __init__(self, samples: int):
+        self.in_flight = 0
+        self.queued = 0
+        self.granted = 0
+        self.waits: deque = deque(maxlen=samples)
+
+
+class RequestScheduler:
+    """Grants request slots by priority under a global rate limit and per-class concurrency caps."""
+
+    def __init__(self, rate: float = 0, burst: Optional[float] = None, caps: Optional[Dict[str, int]] = None,
+                 samples: int = 1000):
+        """
+        Args:
+            rate: Requests per second across all classes (0 for no limit)
+            burst: Requests allowed back to back before the rate applies (default: rate)
+            caps: Maximum concurrent requests per class (default: DEFAULT_CAPS)
+            samples: Queue-time samples kept per class for percentiles
+        """
+        self.bucket = TokenBucket(rate, burst if burst is not None else max(rate, 1))
+        self.caps = dict(DEFAULT_CAPS, **(caps or {}))
+        self._cond = threading.Condition()
+        self._waiting: list = []
+        self._seq = itertools.count()
+        self._stats = {p: _ClassStats(samples) for p in PRIORITIES}
+
+    def _next(self):
+        """The waiter to serve next: the highest-priority, oldest one whose class is under its cap."""
+        for entry in self._waiting:
+            priority = PRIORITIES[entry[0]]
+            if self._stats[priority].in_flight < self.caps[priority]:
+                return entry
+        return None
+
+    @contextmanager
+    def slot(self, priority: str) -> Iterator[float]:
+        """
+        Wait for permission to send one request, holding it for the duration of the block.
+
+        Args:
+            priority: 'interactive', 'write' or 'background'
+
+        Yields:
+            Seconds spent queued
+        """
+        stats = self._stats[priority]
+        entry = (PRIORITIES.index(priority), next(self._seq))
+        started = time.monotonic()
+        with self._cond:
+            bisect.insort(self._waiting, entry)
+            stats.queued += 1
+            try:
+                while True:
+                    if self._next() is entry:
+                        delay = self.bucket.take()
+                        if delay == 0:
+                            break
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            finally:
+                self._waiting.remove(entry)
+                stats.queued -= 1
+                # Whoever is next may now be eligible
+                self._cond.notify_all()
+            waited = time.monotonic() - started
+            stats.in_flight += 1
+            stats.granted += 1
+            stats.waits.append(waited)
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                stats.in_flight -= 1
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth, concurrency and queue-time percentiles (ms) per priority class."""
+        result = {}
+        with self._cond:
+            for priority, s in self._stats.items():
+                waits = sorted(s.waits)
+
+                def pct(p):
+                    return round(waits[min(len(waits) - 1, int(p / 100 * len(waits)))] * 1000, 2) if waits else 0.0
+
+                result[priority] = {'queued': s.queued, 'in_flight': s.in_flight, 'cap': self.caps[priority],
+                                    'granted': s.granted, 'wait_p50_ms': pct(50), 'wait_p95_ms': pct(95),
+                                    'wait_max_ms': round(waits[-1] * 1000, 2) if waits else 0.0}
+        return result
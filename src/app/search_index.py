@@ -0,0 +1,164 @@
+"""
+In-process search index over the BGG catalogue.
+Supports faceted queries on mechanic/category tokens and numeric ranges
+without scanning every game row.
+"""
+
+import bisect
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Free-text fields that are split into tokens
+TOKEN_FIELDS = ('mechanic', 'category')
+
+# Numeric fields that get a sorted range index
+RANGE_FIELDS = ('complexity', 'playingTime', 'minPlayers', 'maxPlayers', 'ranking')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split a BGG mechanic/category string into normalised tokens.
+
+    Args:
+        text: Comma-separated free text, e.g. "Worker Placement, Hand Management"
+
+    Returns:
+        List of lower-case tokens with surrounding whitespace removed
+    """
+    if not text:
+        return []
+    return [t.strip().lower() for t in str(text).split(',') if t.strip()]
+
+
+def _number(value: Any) -> Optional[float]:
+    """Coerce a column value to a float, or None if it is missing or invalid."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class GameSearchIndex:
+    """Inverted and range indexes over a list of BGG game rows."""
+
+    def __init__(self, games: Iterable[Dict[str, Any]]):
+        """
+        Build the index.
+
+        Args:
+            games: BGG rows with at least an 'id', plus any of the token and range fields
+        """
+        self.games: Dict[int, Dict[str, Any]] = {}
+        # field -> token -> set of game ids
+        self.postings: Dict[str, Dict[str, Set[int]]] = {f: {} for f in TOKEN_FIELDS}
+        # field -> game id -> tokens (forward index, used for facet counts)
+        self.tokens: Dict[str, Dict[int, List[str]]] = {f: {} for f in TOKEN_FIELDS}
+        # field -> sorted list of (value, game id)
+        self.ranges: Dict[str, List[Tuple[float, int]]] = {f: [] for f in RANGE_FIELDS}
+
+        for game in games:
+            game_id = game.get('id')
+            if game_id is None:
+                continue
+            game_id = int(game_id)
+            self.games[game_id] = game
+
+            for field in TOKEN_FIELDS:
+                toks = tokenize(game.get(field))
+                self.tokens[field][game_id] = toks
+                for tok in toks:
+                    self.postings[field].setdefault(tok, set()).add(game_id)
+
+            for field in RANGE_FIELDS:
+                value = _number(game.get(field))
+                if value is not None:
+                    self.ranges[field].append((value, game_id))
+
+        for entries in self.ranges.values():
+            entries.sort()
+
+        self.all_ids: Set[int] = set(self.games)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def _range_ids(self, field: str, low: Optional[float], high: Optional[float]) -> Set[int]:
+        """Return ids whose field value lies in [low, high] (either bound may be open)."""
+        entries = self.ranges[field]
+        start = 0 if low is None else bisect.bisect_left(entries, (low, float('-inf')))
+        end = len(entries) if high is None else bisect.bisect_right(entries, (high, float('inf')))
+        return {game_id for _, game_id in entries[start:end]}
+
+    def _token_ids(self, field: str, values: Iterable[str]) -> Set[int]:
+        """Return ids that carry every one of the given tokens."""
+        sets = [self.postings[field].get(v.strip().lower(), set()) for v in values]
+        return set.intersection(*sets) if sets else set(self.all_ids)
+
+    def search(
+        self,
+        mechanics: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        players: Optional[int] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None
+    ) -> List[int]:
+        """
+        Run a faceted query by intersecting posting and range sets.
+
+        Args:
+            mechanics: Mechanic tokens that must all be present
+            categories: Category tokens that must all be present
+            players: Player count that must fall within minPlayers..maxPlayers
+            ranges: Mapping of range field to (low, high) inclusive bounds
+
+        Returns:
+            Matching game ids, ordered by game name
+        """
+        candidates: List[Set[int]] = []
+        if mechanics:
+            candidates.append(self._token_ids('mechanic', mechanics))
+        if categories:
+            candidates.append(self._token_ids('category', categories))
+        if players is not None:
+            candidates.append(self._range_ids('minPlayers', None, players))
+            candidates.append(self._range_ids('maxPlayers', players, None))
+        for field, (low, high) in (ranges or {}).items():
+            if field not in self.ranges:
+                raise ValueError(f"Unknown range field: {field}")
+            if low is not None or high is not None:
+                candidates.append(self._range_ids(field, low, high))
+
+        if candidates:
+            # Intersect smallest-first so the working set only shrinks
+            candidates.sort(key=len)
+            result = set(candidates[0])
+            for ids in candidates[1:]:
+                if not result:
+                    break
+                result &= ids
+        else:
+            result = set(self.all_ids)
+
+        return sorted(result, key=lambda i: str(self.games[i].get('name') or ''))
+
+    def facet_counts(self, field: str, ids: Optional[Iterable[int]] = None) -> List[Tuple[str, int]]:
+        """
+        Count token occurrences for a facet field over a result set.
+
+        Args:
+            field: 'mechanic' or 'category'
+            ids: Game ids to count over (default: the whole catalogue)
+
+        Returns:
+            List of (token, count) pairs, most common first
+        """
+        forward = self.tokens[field]
+        counts = Counter()
+        for game_id in (self.all_ids if ids is None else ids):
+            counts.update(forward.get(game_id, ()))
+        return counts.most_common()
+
+    def rows(self, ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Return the stored game rows for a list of ids."""
+        return [self.games[i] for i in ids]
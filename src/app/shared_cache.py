@@ -0,0 +1,149 @@
+"""
+Cross-process response cache for the API client.
+Backed by a local SQLite file so every worker process on a host shares one
+bounded copy of the cached data and sees invalidations immediately.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCache:
+    """SQLite-backed cache with a global, atomically bumped data version."""
+
+    def __init__(self, path: str, max_entries: int = 256, ttl: float = 300, max_value_bytes: int = 4 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite file shared by all workers
+            max_entries: Maximum number of cached responses kept on disk
+            ttl: Maximum age of an entry in seconds
+            max_value_bytes: Responses larger than this are not cached
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_value_bytes = max_value_bytes
+        self._local = threading.local()
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        """Return this thread's connection, reopening it after a fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._conn()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (name, value) VALUES ('version', 0);
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_stored_at ON entries(stored_at);
+        ''')
+
+    def version(self) -> int:
+        """Return the current data version (-1 if the cache file cannot be read)."""
+        try:
+            row = self._conn().execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Shared cache %s unreadable: %s", self.path, e)
+            return -1
+        return row[0] if row else 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached value.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if missing, expired, from an older data version
+            or unreadable (a locked or damaged cache file is treated as a miss)
+        """
+        try:
+            row = self._conn().execute(
+                "SELECT value FROM entries WHERE key = ? AND stored_at > ? "
+                "AND version = (SELECT value FROM meta WHERE name = 'version')",
+                (key, time.time() - self.ttl)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Shared cache read failed for %s: %s", key, e)
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, version: int) -> None:
+        """
+        Store a value fetched under a given data version.
+
+        The write is dropped if the version has moved on since the fetch began,
+        so a response that raced an invalidation is never cached. A failed write
+        is logged and skipped.
+
+        Args:
+            key: Cache key
+            value: JSON-serialisable value
+            version: Data version read before the value was fetched
+        """
+        text = json.dumps(value)
+        if len(text.encode()) > self.max_value_bytes:
+            return
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, version, stored_at, value) "
+                "SELECT ?, ?, ?, ? WHERE ? = (SELECT value FROM meta WHERE name = 'version')",
+                (key, version, time.time(), text, version))
+            # Evict the oldest entries beyond the size bound
+            conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,))
+        except sqlite3.Error as e:
+            logger.warning("Shared cache write failed for %s: %s", key, e)
+
+    def invalidate(self) -> Optional[int]:
+        """
+        Bump the data version, making every cached entry stale in all workers.
+
+        A failure is logged and reported as None; entries cached by other
+        workers then live until their TTL.
+
+        Returns:
+            The new data version, or None if the cache could not be updated
+        """
+        try:
+            conn = self._conn()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+                version = conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+                conn.execute("DELETE FROM entries WHERE version < ?", (version,))
+                conn.execute('COMMIT')
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.error("Shared cache invalidation failed: %s", e)
+            return None
+        logger.debug("Cache invalidated, data version now %s", version)
+        return version
@@ -0,0 +1,122 @@
+"""
+Measure web app startup: wall-clock time to import each app module, and the
+import and initialization time of every module it loads (via -X importtime).
+
+Each measurement runs in a fresh interpreter, so nothing is cached between
+runs except the OS file cache and compiled bytecode.
+
+Usage:
+    python startup_profile.py [app] [main] [--top 15] [--runs 5] [--budget-ms 800]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Subsystems that should not be loaded until first use
+LAZY_MODULES = ('requests', 'numpy', 'play_snapshot')
+
+
+def _env() -> Dict[str, str]:
+    # Don't let the caller's tracing settings start exporters during the measurement
+    env = {k: v for k, v in os.environ.items() if not k.startswith(('EUROGAMES_TRACE', 'EUROGAMES_OTLP'))}
+    env.setdefault('FLASK_SECRET_KEY', 'startup-profile')
+    return env
+
+
+def _run(code: str, importtime: bool = False) -> Tuple[float, str]:
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    started = time.perf_counter()
+    result = subprocess.run(cmd, cwd=HERE, env=_env(), capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"'{code}' failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+
+def startup_ms(module: str, runs: int = 5) -> float:
+    """Median time to import a module in a fresh interpreter, less bare interpreter startup."""
+    baseline = statistics.median(_run('pass')[0] for _ in range(runs))
+    total = statistics.median(_run(f'import {module}')[0] for _ in range(runs))
+    return max(0.0, (total - baseline) * 1000)
+
+
+def import_times(module: str) -> List[Dict[str, object]]:
+    """
+    Per-module import times for importing a module.
+
+    Returns:
+        Entries with 'name', 'depth' (0 = the module itself, 1 = its direct imports), 'self_ms'
+        and 'cumulative_ms', in import order. Time spent running a module's top-level code
+        counts as its self time. Interpreter startup imports (site etc.) are left out.
+    """
+    _, stderr = _run(f'import {module}', importtime=True)
+    entries: List[Dict[str, object]] = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append({'name': name.strip(), 'depth': depth, 'self_ms': int(self_us) / 1000,
+                        'cumulative_ms': int(cumulative_us) / 1000})
+        # A module is reported after everything it imported, so a new top-level entry closes a group
+        if depth == 0 and name.strip() != module:
+            entries = []
+    return entries
+
+
+def report(module: str, top: int = 15, runs: int = 5) -> Tuple[float, str]:
+    """Measure one module and render its startup report."""
+    total = startup_ms(module, runs)
+    entries = import_times(module)
+    names = {e['name'] for e in entries}
+
+    lines = [f"{module}: {total:.0f} ms to import (median of {runs}, interpreter startup excluded)", '',
+             f"  {'slowest direct imports':<44} {'cumulative ms':>14}"]
+    direct = [e for e in entries if e['depth'] == 1]
+    for e in sorted(direct, key=lambda e: e['cumulative_ms'], reverse=True)[:top]:
+        lines.append(f"  {e['name']:<44} {e['cumulative_ms']:>14.1f}")
+    lines += ['', f"  {'slowest modules (own import + init)':<44} {'self ms':>14}"]
+    for e in sorted(entries, key=lambda e: e['self_ms'], reverse=True)[:top]:
+        lines.append(f"  {e['name']:<44} {e['self_ms']:>14.1f}")
+    eager = [m for m in LAZY_MODULES if m in names]
+    if eager:
+        lines += ['', f"  loaded eagerly, expected lazily: {', '.join(eager)}"]
+    return total, '\n'.join(lines)
+
+
+def eager_modules(module: str) -> List[str]:
+    """Modules in LAZY_MODULES that importing the given module loads."""
+    names = {e['name'] for e in import_times(module)}
+    return [m for m in LAZY_MODULES if m in names]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=['app', 'main'], help="App modules to measure")
+    parser.add_argument('--top', type=int, default=15, help="Rows per table")
+    parser.add_argument('--runs', type=int, default=5, help="Timed runs per module")
+    parser.add_argument('--budget-ms', type=float, help="Exit non-zero if any module takes longer")
+    args = parser.parse_args(argv)
+
+    over = []
+    for module in args.modules:
+        total, text = report(module, args.top, args.runs)
+        print(text)
+        print()
+        if args.budget_ms is not None and total > args.budget_ms:
+            over.append(f"{module} ({total:.0f} ms)")
+    if over:
+        print(f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
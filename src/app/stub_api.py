@@ -0,0 +1,236 @@
+"""
+Stand-in for the Eurogames Workers API, serving synthetic data locally.
+Used for load tests and offline runs of the web apps.
+
+Usage:
+    python stub_api.py [--port 8788] [--games 200] [--plays 5000] [--latency 0.02]
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+WINNERS = ('Andrew', 'Trish', 'Draw')
+STATUSES = ('Playing', 'Inbox', 'Evaluating', 'Dropped')
+MECHANICS = ('Worker Placement', 'Hand Management', 'Set Collection', 'Tile Placement', 'Deck Building',
+             'Area Control', 'Engine Building', 'Drafting')
+CATEGORIES = ('Economic', 'Farming', 'Card Game', 'Fantasy', 'Medieval', 'Trains', 'Space')
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'migrations')
+
+
+class StubData:
+    """Synthetic bgg/notes/log tables and the API views derived from them."""
+
+    def __init__(self, games: int = 200, plays: int = 5000, seed: int = 1):
+        rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.bgg = [{
+            'id': 1000 + i,
+            'name': f"Game {i:04d}",
+            'yearPublished': rng.randint(1995, 2025),
+            'complexity': round(rng.uniform(1.0, 4.5), 2),
+            'playingTime': rng.choice((30, 45, 60, 90, 120, 180)),
+            'mechanic': ', '.join(rng.sample(MECHANICS, 3)),
+            'category': ', '.join(rng.sample(CATEGORIES, 2)),
+            'minPlayers': rng.choice((1, 2)),
+            'maxPlayers': rng.choice((2, 4, 5)),
+            'rating': round(rng.uniform(6, 8.5), 2),
+            'ranking': rng.randint(1, 5000),
+            'retrieved': '2025-01-01',
+        } for i in range(games)]
+        self.notes = [{'id': g['id'], 'status': rng.choice(STATUSES), 'platform': 'BGA', 'uri': None,
+                       'comment': None} for g in self.bgg]
+        start = datetime.date(2015, 1, 1)
+        self.log = sorted(({
+            'date': (start + datetime.timedelta(days=rng.randint(0, 3650))).isoformat(),
+            'id': rng.choice(self.bgg)['id'],
+            'winner': rng.choice(WINNERS),
+            'scores': f"{rng.randint(40, 120)}-{rng.randint(40, 120)}",
+            'comment': None,
+        } for _ in range(plays)), key=lambda p: p['date'], reverse=True)
+        self.names = {g['id']: g['name'] for g in self.bgg}
+        self._db: Optional[sqlite3.Connection] = None
+
+    def add_play(self, play: dict) -> None:
+        row = {'date': play.get('date'), 'id': int(play.get('game_id')), 'winner': play.get('winner'),
+               'scores': play.get('scores'), 'comment': play.get('comment')}
+        with self.lock:
+            self.log.insert(0, row)
+            if self._db is not None:
+                self._db.execute('PRAGMA query_only = OFF')
+                with self._db:
+                    self._db.execute('INSERT OR IGNORE INTO log (date, id, winner, scores, comment) '
+                                     'VALUES (:date, :id, :winner, :scores, :comment)', row)
+                self._db.execute('PRAGMA query_only = ON')
+
+    def _database(self) -> sqlite3.Connection:
+        """In-memory SQLite copy of the tables with the migrations applied, built on first use."""
+        if self._db is None:
+            db = sqlite3.connect(':memory:', check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql'))):
+                with open(path) as f:
+                    db.executescript(f.read())
+            for table, rows in (('bgg', self.bgg), ('notes', self.notes), ('log', reversed(self.log))):
+                rows = list(rows)
+                columns = list(rows[0]) if rows else []
+                db.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                               f"VALUES ({', '.join(':' + c for c in columns)})", rows)
+            db.commit()
+            db.execute('PRAGMA query_only = ON')
+            self._db = db
+        return self._db
+
+    def query(self, sql: str, params: list):
+        with self.lock:
+            return [dict(row) for row in self._database().execute(sql, params).fetchall()]
+
+    def played(self, limit: int):
+        return [dict(p, name=self.names.get(p['id'])) for p in self.log[:limit]]
+
+    def games(self, status=None):
+        counts, last = {}, {}
+        for p in self.log:
+            counts[p['id']] = counts.get(p['id'], 0) + 1
+            last[p['id']] = max(last.get(p['id'], ''), p['date'])
+        status_of = {n['id']: n['status'] for n in self.notes}
+        rows = [{'name': g['name'], 'id': g['id'], 'status': status_of.get(g['id']), 'complexity': g['complexity'],
+                 'ranking': g['ranking'], 'games': counts.get(g['id'], 0), 'lastPlayed': last.get(g['id'])}
+                for g in self.bgg]
+        return [r for r in rows if status is None or r['status'] == status]
+
+    def winners(self):
+        stats = {}
+        for p in self.log:
+            s = stats.setdefault(p['id'], {'gameId': p['id'], 'gameName': self.names.get(p['id']),
+                                           'totalGames': 0, 'andrew': 0, 'trish': 0, 'draw': 0})
+            s['totalGames'] += 1
+            key = p['winner'].lower()
+            if key in s:
+                s[key] += 1
+        return sorted(stats.values(), key=lambda s: s['gameName'] or '')
+
+    def totals(self):
+        return {'totalGames': len(self.log),
+                'andrew': sum(p['winner'] == 'Andrew' for p in self.log),
+                'trish': sum(p['winner'] == 'Trish' for p in self.log),
+                'draw': sum(p['winner'] == 'Draw' for p in self.log)}
+
+    def last_played(self):
+        today = datetime.date.today()
+        rows = {}
+        for g in self.games('Playing'):
+            if g['lastPlayed']:
+                days = (today - datetime.date.fromisoformat(g['lastPlayed'])).days
+                rows[g['id']] = {'lastPlayed': g['lastPlayed'], 'daysSince': days, 'games': g['games'],
+                                 'id': g['id'], 'name': g['name']}
+        return sorted(rows.values(), key=lambda r: r['lastPlayed'], reverse=True)
+
+
+def make_handler(data: StubData, latency: float):
+    """Build a request handler class bound to a data set."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, payload) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            path = url.path.rstrip('/')
+            if path == '/v1/games':
+                return self._send(200, {'data': data.games(query.get('status'))})
+            match = re.fullmatch(r'/v1/games/(\d+)', path)
+            if match:
+                game_id = int(match.group(1))
+                game = next((g for g in data.bgg if g['id'] == game_id), None)
+                return self._send(200 if game else 404, {'data': game} if game else {'error': 'Not found'})
+            match = re.fullmatch(r'/v1/games/(\d+)/history', path)
+            if match:
+                game_id = int(match.group(1))
+                return self._send(200, {'data': [p for p in data.played(len(data.log)) if p['id'] == game_id]})
+            if path in ('/v1/plays', '/v1/stats/recent'):
+                return self._send(200, {'data': data.played(int(query.get('limit', 100)))})
+            if path == '/v1/stats/winners':
+                return self._send(200, {'data': data.winners()})
+            if path == '/v1/stats/totals':
+                return self._send(200, {'data': [data.totals()]})
+            if path == '/v1/stats/last-played':
+                return self._send(200, {'data': data.last_played()})
+            if path == '/v1/export':
+                return self._send(200, {'data': {'bgg': data.bgg, 'notes': data.notes, 'log': data.log}})
+            self._send(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if latency:
+                time.sleep(latency)
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            path = urlparse(self.path).path.rstrip('/')
+            if path == '/v1/plays':
+                data.add_play(payload)
+                return self._send(201, {'success': True})
+            if path == '/v1/query':
+                try:
+                    return self._send(200, {'data': data.query(payload.get('query', ''), payload.get('params', []))})
+                except sqlite3.Error as e:
+                    return self._send(400, {'error': str(e)})
+            self._send(404, {'error': 'Not found'})
+
+    return StubHandler
+
+
+def start_stub(port: int = 0, games: int = 200, plays: int = 5000, latency: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Start the stub API in a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        games: Number of synthetic games
+        plays: Number of synthetic plays
+        latency: Artificial delay per request in seconds
+
+    Returns:
+        The running server; its URL is http://127.0.0.1:<server.server_port>
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(StubData(games, plays), latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8788)
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--plays', type=int, default=5000)
+    parser.add_argument('--latency', type=float, default=0.02, help="Artificial delay per request (seconds)")
+    args = parser.parse_args()
+    server = start_stub(args.port, args.games, args.plays, args.latency)
+    print(f"Stub API listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
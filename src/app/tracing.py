@@ -0,0 +1,335 @@
+"""
+Lightweight request tracing.
+
+Each Flask request becomes a trace; route handling, upstream API calls, JSON
+decoding and template rendering are recorded as spans. The trace context is
+propagated upstream in a W3C ``traceparent`` header. Spans are exported to a
+JSON-lines file (EUROGAMES_TRACE_FILE) or an OTLP/HTTP JSON collector
+(EUROGAMES_OTLP_ENDPOINT). With neither set, tracing is a no-op.
+
+Print a per-request waterfall from a trace file with:
+
+    python tracing.py <trace-file> [trace-id]
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional['Span']] = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'start_ns', 'end_ns', 'attributes', 'error')
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes: Any):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.error: Optional[str] = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Set a span attribute."""
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled."""
+
+    trace_id = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLinesExporter:
+    """Appends finished spans to a local JSON-lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        lines = ''.join(json.dumps(s.to_dict()) + '\n' for s in spans)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(lines)
+
+
+class OTLPExporter:
+    """Posts spans as OTLP/HTTP JSON to a collector from a background thread."""
+
+    def __init__(self, endpoint: str, service_name: str = 'eurogames-web', batch_size: int = 64):
+        self.endpoint = endpoint.rstrip('/') + '/v1/traces'
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                return
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        def value(v):
+            if isinstance(v, bool):
+                return {'boolValue': v}
+            if isinstance(v, int):
+                return {'intValue': str(v)}
+            if isinstance(v, float):
+                return {'doubleValue': v}
+            return {'stringValue': str(v)}
+
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': value(self.service_name)}]},
+            'scopeSpans': [{'scope': {'name': 'eurogames.tracing'}, 'spans': [{
+                'traceId': s.trace_id,
+                'spanId': s.span_id,
+                'parentSpanId': s.parent_id or '',
+                'name': s.name,
+                'kind': 1,
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano': str(s.end_ns),
+                'attributes': [{'key': k, 'value': value(v)} for k, v in s.attributes.items()],
+                'status': {'code': 2, 'message': s.error} if s.error else {},
+            } for s in spans]}],
+        }]}
+
+    def _run(self) -> None:
+        import requests
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=0.5))
+                except queue.Empty:
+                    break
+            try:
+                requests.post(self.endpoint, json=self._payload(batch), timeout=5)
+            except requests.exceptions.RequestException as e:
+                logger.warning("Trace export failed: %s", e)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter."""
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+                   **attributes: Any) -> Span:
+        """
+        Start a span without making it current (for leaf spans and request roots).
+
+        Args:
+            name: Span name
+            trace_id: Trace to join (default: the current span's trace, or a new one)
+            parent_id: Parent span id (default: the current span)
+            attributes: Initial span attributes
+        """
+        parent = _current_span.get()
+        if trace_id is None:
+            trace_id = parent.trace_id if parent else secrets.token_hex(16)
+            parent_id = parent_id or (parent.span_id if parent else None)
+        return Span(name, trace_id, parent_id, **attributes)
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None) -> None:
+        """Finish a span and export it."""
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        try:
+            self.exporter.export([span])
+        except Exception as e:
+            logger.warning("Trace export failed: %s", e)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Any]:
+        """Run a block as a child span of the current span."""
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+        span = self.start_span(name, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            _current_span.reset(token)
+            self.end_span(span, e)
+            raise
+        _current_span.reset(token)
+        self.end_span(span)
+
+    def activate(self, span: Span) -> None:
+        """Make a span current for the rest of this context (used for request roots)."""
+        _current_span.set(span)
+
+
+def _exporter_from_env():
+    if os.environ.get('EUROGAMES_OTLP_ENDPOINT'):
+        return OTLPExporter(os.environ['EUROGAMES_OTLP_ENDPOINT'])
+    if os.environ.get('EUROGAMES_TRACE_FILE'):
+        return JsonLinesExporter(os.environ['EUROGAMES_TRACE_FILE'])
+    return None
+
+
+tracer = Tracer(_exporter_from_env())
+
+
+def trace_headers() -> Dict[str, str]:
+    """Return the W3C traceparent header for the current span, if any."""
+    span = _current_span.get()
+    if span is None:
+        return {}
+    return {'traceparent': f"00-{span.trace_id}-{span.span_id}-01"}
+
+
+def current_trace_id() -> Optional[str]:
+    """Return the trace id of the current span, if any."""
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+def _parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_span_id) from a traceparent header, or (None, None)."""
+    parts = (header or '').split('-')
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+
+def install_tracing(app) -> None:
+    """
+    Trace every request handled by a Flask app.
+
+    Args:
+        app: Flask application
+    """
+    if not tracer.enabled:
+        return
+    from flask import before_render_template, g, request, template_rendered
+
+    @app.before_request
+    def start_request_span():
+        trace_id, parent_id = _parse_traceparent(request.headers.get('traceparent'))
+        # Worker threads are reused, so every request starts a fresh trace unless one was propagated
+        trace_id = trace_id or secrets.token_hex(16)
+        g.trace_span = tracer.start_span(f"{request.method} {request.path}", trace_id=trace_id,
+                                         parent_id=parent_id, route=request.endpoint)
+        tracer.activate(g.trace_span)
+
+    @app.after_request
+    def add_trace_header(response):
+        span = g.get('trace_span')
+        if span is not None:
+            span.set('http.status_code', response.status_code)
+            response.headers['X-Trace-Id'] = span.trace_id
+            # End the span once the body has been sent, so streamed responses are covered
+            response.call_on_close(lambda: end_request_span(span))
+        return response
+
+    def end_request_span(span):
+        if _current_span.get() is span:
+            _current_span.set(None)
+        tracer.end_span(span)
+
+    @app.teardown_request
+    def record_request_error(error=None):
+        span = g.get('trace_span')
+        if span is not None and error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+
+    def render_started(sender, template, context, **extra):
+        root = g.get('trace_span')
+        if root is not None:
+            g.render_span = tracer.start_span(f"render {template.name}", trace_id=root.trace_id,
+                                              parent_id=root.span_id)
+
+    def render_finished(sender, template, context, **extra):
+        span = g.pop('render_span', None)
+        if span is not None:
+            tracer.end_span(span)
+
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+
+
+def waterfall(spans: List[Dict[str, Any]], width: int = 50) -> str:
+    """Render one trace's spans as a text waterfall, children indented under parents."""
+    if not spans:
+        return ''
+    t0 = min(s['start_ns'] for s in spans)
+    total = max(s['end_ns'] for s in spans) - t0 or 1
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    ids = {s['span_id'] for s in spans}
+    for s in sorted(spans, key=lambda s: s['start_ns']):
+        parent = s['parent_id'] if s['parent_id'] in ids else None
+        children.setdefault(parent, []).append(s)
+
+    lines = []
+
+    def walk(parent, depth):
+        for s in children.get(parent, []):
+            offset = int((s['start_ns'] - t0) / total * width)
+            length = max(1, int((s['end_ns'] - s['start_ns']) / total * width))
+            bar = ' ' * offset + '#' * length
+            label = ('  ' * depth + s['name'])[:40]
+            lines.append(f"{label:<40} {bar:<{width}} {s['duration_ms']:>9.2f} ms")
+            walk(s['span_id'], depth + 1)
+
+    walk(None, 0)
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} <trace-file> [trace-id]")
+        sys.exit(1)
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(sys.argv[1]) as f:
+        for line in f:
+            span = json.loads(line)
+            traces.setdefault(span['trace_id'], []).append(span)
+    wanted = sys.argv[2:] or list(traces)[-1:]
+    for trace_id in wanted:
+        print(f"trace {trace_id}")
+        print(waterfall(traces.get(trace_id, [])))
+        print()
@@ -0,0 +1,210 @@
+"""
+HTTP transports for EurogamesAPIClient.
+
+RequestsTransport talks to the live API. RecordingTransport wraps another
+transport and saves every exchange to a fixture file (every few seconds while
+recording, and at exit); ReplayTransport serves
+a fixture file back, optionally with simulated latency, so the client and the
+apps can run offline and reproducibly.
+
+Select one with EUROGAMES_TRANSPORT:
+
+    EUROGAMES_TRANSPORT=record:fixtures/api.json.gz   # live calls, saved to the fixture
+    EUROGAMES_TRANSPORT=replay:fixtures/api.json.gz   # no network; EUROGAMES_REPLAY_LATENCY=0.05 adds delay
+
+Fixtures hold the method, path, query and body of each request and the status
+and body of its response. Request headers (including the API key) are never
+saved. Files ending in .gz are gzip-compressed.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from http import HTTPStatus
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_FORMAT = 1
+
+
+class TransportError(Exception):
+    """Exception raised when a request cannot be completed or returns an error status."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # HTTP status of an error response (None if there was no response)
+        self.status_code = status_code
+
+
+class TransportResponse:
+    """Status and body of an HTTP response."""
+
+    __slots__ = ('status_code', 'content', 'url')
+
+    def __init__(self, status_code: int, content: bytes, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+
+    def raise_for_status(self) -> None:
+        """Raise TransportError for 4xx and 5xx responses."""
+        if self.status_code >= 400:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            try:
+                reason = HTTPStatus(self.status_code).phrase
+            except ValueError:
+                reason = ''
+            raise TransportError(f"{self.status_code} {kind} Error: {reason} for url: {self.url}",
+                                 status_code=self.status_code)
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.content)
+        except ValueError as e:
+            raise TransportError(f"Invalid JSON in response from {self.url}: {e}") from e
+
+
+def exchange_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                 body: Optional[Any] = None) -> str:
+    """Identify a request independently of the API host, e.g. 'GET /v1/plays?limit=100'."""
+    parts = urlsplit(url)
+    key = f"{method.upper()} {parts.path}"
+    query = sorted((params or {}).items())
+    if parts.query:
+        key += '?' + parts.query + ('&' + urlencode(query) if query else '')
+    elif query:
+        key += '?' + urlencode(query)
+    if body is not None:
+        key += ' #' + hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+    return key
+
+
+class RequestsTransport:
+    """Live HTTP transport using requests (imported on first use)."""
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                json_body: Optional[Any] = None, headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> TransportResponse:
+        import requests
+        try:
+            response = requests.request(method, url, params=params, json=json_body, headers=headers,
+                                        timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        return TransportResponse(response.status_code, response.content, response.url)
+
+
+def _read_fixture(path: str) -> Dict[str, Any]:
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        fixture = json.load(f)
+    if fixture.get('format') != FIXTURE_FORMAT:
+        raise TransportError(f"{path} is not a version {FIXTURE_FORMAT} fixture file")
+    return fixture
+
+
+class RecordingTransport:
+    """Passes requests to another transport and saves the exchanges to a fixture file."""
+
+    def __init__(self, path: str, inner: Optional[RequestsTransport] = None, flush_interval: float = 5.0):
+        """
+        Args:
+            path: Fixture file; existing exchanges in it are kept, and re-recorded ones replaced
+            inner: Transport making the real requests (default: RequestsTransport)
+            flush_interval: Least seconds between fixture writes while recording (it is also
+                written by flush(), close() and at exit)
+        """
+        self.path = path
+        self.inner = inner or RequestsTransport()
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._flushed = time.monotonic()
+        self.exchanges: Dict[str, Dict[str, Any]] = (
+            _read_fixture(path)['exchanges'] if os.path.exists(path) else {})
+        atexit.register(self.close)
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                json_body: Optional[Any] = None, headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> TransportResponse:
+        response = self.inner.request(method, url, params=params, json_body=json_body, headers=headers,
+                                      timeout=timeout)
+        key = exchange_key(method, url, params, json_body)
+        with self._lock:
+            self.exchanges[key] = {'status': response.status_code, 'body': response.content.decode('utf-8')}
+            self._dirty = True
+            due = time.monotonic() - self._flushed >= self.flush_interval
+        if due:
+            self.flush()
+        return response
+
+    def flush(self) -> None:
+        """Write the fixture file, if anything was recorded since the last write."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                exchanges = dict(self.exchanges)
+                self._dirty = False
+                self._flushed = time.monotonic()
+            tmp = self.path + '.tmp'
+            opener = gzip.open if self.path.endswith('.gz') else open
+            with opener(tmp, 'wt', encoding='utf-8') as f:
+                json.dump({'format': FIXTURE_FORMAT, 'exchanges': exchanges}, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        """Write out any exchanges not saved yet."""
+        self.flush()
+
+
+class ReplayTransport:
+    """Serves recorded exchanges from a fixture file, without network access."""
+
+    def __init__(self, path: str, latency: float = 0.0, jitter: float = 0.0):
+        """
+        Args:
+            path: Fixture file written by RecordingTransport
+            latency: Simulated delay per request, in seconds
+            jitter: Random extra delay of up to this many seconds
+        """
+        self.exchanges = _read_fixture(path)['exchanges']
+        self.latency = latency
+        self.jitter = jitter
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                json_body: Optional[Any] = None, headers: Optional[Dict[str, str]] = None,
+                timeout: Optional[float] = None) -> TransportResponse:
+        key = exchange_key(method, url, params, json_body)
+        exchange = self.exchanges.get(key)
+        if exchange is None:
+            raise TransportError(f"No recorded response for {key}")
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+        return TransportResponse(exchange['status'], exchange['body'].encode('utf-8'), url)
+
+
+def transport_from_env():
+    """Build the transport selected by EUROGAMES_TRANSPORT (default: live requests)."""
+    spec = os.environ.get('EUROGAMES_TRANSPORT', '')
+    mode, _, path = spec.partition(':')
+    if mode == 'record' and path:
+        logger.info("Recording API exchanges to %s", path)
+        return RecordingTransport(path)
+    if mode == 'replay' and path:
+        logger.info("Replaying API exchanges from %s", path)
+        return ReplayTransport(path, latency=float(os.environ.get('EUROGAMES_REPLAY_LATENCY', 0)),
+                               jitter=float(os.environ.get('EUROGAMES_REPLAY_JITTER', 0)))
+    if spec and spec != 'live':
+        raise ValueError(f"Unknown EUROGAMES_TRANSPORT '{spec}' (use live, record:<file> or replay:<file>)")
+    return RequestsTransport()
@@ -0,0 +1,177 @@
+"""
+Disk-persisted warm-start snapshot of the API client's datasets.
+
+The client records its latest games list, plays and stats responses here. They
+are written to a local JSON file periodically and at exit; after a restart they
+are loaded in the background and served as stale-but-valid until the client
+has refetched them, so a cold start does not wait on the API.
+
+With a shared cache, each entry keeps the cache's data version it was fetched
+under, and is only served while that is still the current version, so data
+from before a write is never served after it. Without one, entries carry no
+version: a write through the client clears the snapshot, and a response that
+raced the write is not recorded. The sync and async clients use the same stamp
+and keys, so they can share a snapshot file.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+
+class WarmStartStore:
+    """Snapshot of response data keyed by request, with a version stamp."""
+
+    def __init__(self, path: str, stamp: Callable[[], Dict[str, Any]], max_age: float = 24 * 3600,
+                 interval: float = 300, load_timeout: float = 1.0):
+        """
+        Args:
+            path: Snapshot file
+            stamp: Returns the version stamp (e.g. API URL) the snapshot is only valid for
+            max_age: Ignore snapshots older than this many seconds
+            interval: Seconds between periodic saves (0 to only save at exit)
+            load_timeout: Longest a lookup waits for a background load still in progress
+        """
+        self.path = path
+        self.stamp = stamp
+        self.max_age = max_age
+        self.interval = interval
+        self.load_timeout = load_timeout
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._stale: set = set()
+        self._revalidating: set = set()
+        self._dirty = False
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Load the snapshot in the background and schedule saves."""
+        threading.Thread(target=self._load_in_background, name='warm-start-load', daemon=True).start()
+        if self.interval:
+            threading.Thread(target=self._save_periodically, name='warm-start-save', daemon=True).start()
+        atexit.register(self.close)
+
+    def _load_in_background(self) -> None:
+        try:
+            self.load()
+        finally:
+            self._loaded.set()
+
+    def load(self) -> int:
+        """
+        Load the snapshot file, marking its entries stale.
+
+        Returns:
+            Number of entries loaded (0 if the file is missing, expired or stamped for other data)
+        """
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable warm-start snapshot %s: %s", self.path, e)
+            return 0
+
+        if snapshot.get('format') != FORMAT_VERSION or snapshot.get('stamp') != self.stamp():
+            logger.info("Warm-start snapshot is for other data, ignoring it")
+            return 0
+        if time.time() - snapshot.get('saved_at', 0) > self.max_age:
+            logger.info("Warm-start snapshot has expired, ignoring it")
+            return 0
+
+        loaded = 0
+        with self._lock:
+            for key, entry in snapshot.get('entries', {}).items():
+                # Anything fetched since startup is newer than the snapshot
+                if key not in self._entries:
+                    self._entries[key] = entry
+                    self._stale.add(key)
+                    loaded += 1
+        logger.info("Loaded %d warm-start entries from %s", loaded, self.path)
+        return loaded
+
+    def record(self, key: str, data: Any, version: Any = None) -> None:
+        """
+        Store freshly fetched data for a request.
+
+        Args:
+            key: Request key
+            data: Response data
+            version: Data version read before the data was fetched
+        """
+        with self._lock:
+            self._entries[key] = {'data': data, 'version': version, 'fetched_at': time.time()}
+            self._stale.discard(key)
+            self._dirty = True
+
+    def stale(self, key: str, version: Any = None) -> Optional[Any]:
+        """
+        Return snapshot data for a request that has not been refetched since startup, if any.
+
+        Args:
+            key: Request key
+            version: Current data version; entries fetched under another version are ignored
+        """
+        # A client created lazily by the first request would otherwise miss its own snapshot
+        self._loaded.wait(self.load_timeout)
+        with self._lock:
+            entry = self._entries.get(key) if key in self._stale else None
+            if entry is None or entry.get('version') != version:
+                return None
+            return entry['data']
+
+    def claim_revalidation(self, key: str) -> bool:
+        """Return True if the caller should refetch the request (only one caller is told to)."""
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def release_revalidation(self, key: str) -> None:
+        with self._lock:
+            self._revalidating.discard(key)
+
+    def clear(self) -> None:
+        """Drop every entry, e.g. after a write makes them all outdated."""
+        with self._lock:
+            self._entries.clear()
+            self._stale.clear()
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the snapshot atomically, if anything changed since the last save."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {'format': FORMAT_VERSION, 'stamp': self.stamp(), 'saved_at': time.time(),
+                        'entries': dict(self._entries)}
+            self._dirty = False
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not save warm-start snapshot %s: %s", self.path, e)
+            with self._lock:
+                self._dirty = True
+
+    def _save_periodically(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.save()
+
+    def close(self) -> None:
+        """Stop periodic saves and write a final snapshot."""
+        self._stop.set()
+        self.save()
@@ -10,7 +10,6 @@ import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'app'))
 
 def main():
-    import requests
     from api_client import EurogamesAPIClient
 
     client = EurogamesAPIClient()
@@ -23,9 +22,10 @@ def main():
     print("Test 1: Raw API call with NO status parameter")
     print("-" * 80)
     try:
-        url = "https://eurogames.web-c10.workers.dev/v1/games"
+        # Through the client's transport, so EUROGAMES_TRANSPORT record/replay applies
+        url = client.base_url + "/v1/games"
         headers = client._get_auth_header()
-        response = requests.get(url, headers=headers)
+        response = client.transport.request('GET', url, headers=headers, timeout=client.timeout)
         data = response.json()
 
         games = data.get('data', []) if isinstance(data, dict) else data
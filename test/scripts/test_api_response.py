@@ -18,13 +18,13 @@ def main():
     print("API RESPONSE STRUCTURE INSPECTION")
     print("="*80 + "\n")
 
-    # Get raw response for games
-    import requests
-    url = "https://eurogames.web-c10.workers.dev/v1/games"
+    # Get raw response for games, through the client's transport (EUROGAMES_TRANSPORT applies)
+    url = client.base_url + "/v1/games"
     headers = client._get_auth_header()
 
     try:
-        response = requests.get(url, headers=headers, params={'status': 'Playing'})
+        response = client.transport.request('GET', url, params={'status': 'Playing'}, headers=headers,
+                                            timeout=client.timeout)
         data = response.json()
 
         print("GET /v1/games?status=Playing Response:")
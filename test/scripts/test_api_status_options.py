@@ -5,7 +5,6 @@ Test different ways to query the API for all games/statuses.
 
 import sys
 import os
-import requests
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src', 'app'))
 
@@ -29,7 +28,8 @@ def main():
         ("status=Playing", {"status": "Playing"}),
     ]
 
-    url = "https://eurogames.web-c10.workers.dev/v1/games"
+    # Through the client's transport, so EUROGAMES_TRANSPORT record/replay applies
+    url = client.base_url + "/v1/games"
     headers = client._get_auth_header()
 
     for test_name, params_dict in tests:
@@ -37,7 +37,7 @@ def main():
             # Build params properly
             params = {k: v for k, v in params_dict.items() if v is not None} if params_dict else None
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = client.transport.request('GET', url, params=params, headers=headers, timeout=10)
             data = response.json()
 
             games = data.get('data', []) if isinstance(data, dict) else data
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Check queries.bind(), which vets SQL before it is sent to POST /v1/query.
+
+Covers named and positional placeholders, parameter mismatches, comments and
+string literals that look like SQL, multiple statements and writes hidden
+behind a CTE. The query files under data/queries must all pass. No API
+access is needed.
+"""
+
+import sys
+import os
+import re
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'app'))
+
+from queries import QueryError, bind, load_query_files
+
+
+def check(label, ok):
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def binds(sql, params=None, expected=None):
+    """True if bind() accepts the query (and returns `expected`, when given)."""
+    try:
+        result = bind(sql, params)
+    except QueryError:
+        return False
+    return expected is None or result == expected
+
+
+def rejects(sql, params=None):
+    try:
+        bind(sql, params)
+    except QueryError:
+        return True
+    return False
+
+
+def main():
+    print("\n" + "="*80)
+    print("Testing queries.bind()")
+    print("="*80 + "\n")
+
+    results = []
+
+    print("Placeholders")
+    print("-" * 80)
+    results.append(check("Named parameters become '?' in order of use",
+                         binds("SELECT * FROM log WHERE id = :id AND winner = :winner OR id = :id",
+                               {'id': 7, 'winner': 'Trish'},
+                               ("SELECT * FROM log WHERE id = ? AND winner = ? OR id = ?", [7, 'Trish', 7]))))
+    results.append(check("Positional parameters are passed through",
+                         binds("SELECT * FROM log WHERE id = ? AND date > ?", [7, '2024-01-01'],
+                               ("SELECT * FROM log WHERE id = ? AND date > ?", [7, '2024-01-01']))))
+    results.append(check("A missing named parameter is rejected",
+                         rejects("SELECT * FROM log WHERE id = :id", {'winner': 'Andrew'})))
+    results.append(check("Named parameters given as a list are rejected",
+                         rejects("SELECT * FROM log WHERE id = :id", [7])))
+    results.append(check("Too few positional parameters are rejected",
+                         rejects("SELECT * FROM log WHERE id = ? AND date > ?", [7])))
+    results.append(check("Parameters for a query without placeholders are rejected",
+                         rejects("SELECT * FROM log", {'id': 7})))
+    results.append(check("Non-scalar parameter values are rejected",
+                         rejects("SELECT * FROM log WHERE id = :id", {'id': [1, 2]})))
+    print()
+
+    print("Comments and literals")
+    print("-" * 80)
+    results.append(check("Comments are stripped",
+                         binds("-- latest plays\nSELECT * /* all columns */ FROM log", None,
+                               ("SELECT * FROM log", []))))
+    results.append(check("':name' and '?' inside a string are not placeholders",
+                         binds("SELECT * FROM log WHERE comment = 'at 10:30?' AND id = :id", {'id': 1},
+                               ("SELECT * FROM log WHERE comment = 'at 10:30?' AND id = ?", [1]))))
+    results.append(check("Write keywords inside strings and comments are allowed",
+                         binds("SELECT 'DELETE FROM log; DROP TABLE bgg' AS note -- UPDATE log")))
+    results.append(check("replace() the string function is allowed",
+                         binds("SELECT replace(name, 'The ', '') FROM bgg")))
+    print()
+
+    print("Statements")
+    print("-" * 80)
+    results.append(check("A trailing semicolon is allowed", binds("SELECT 1;")))
+    results.append(check("Two statements are rejected", rejects("SELECT 1; SELECT 2")))
+    results.append(check("A statement after a comment is rejected",
+                         rejects("SELECT 1 /* x */; DELETE FROM log")))
+    for sql in ("DELETE FROM log",
+                "PRAGMA table_info(log)",
+                "WITH x AS (SELECT 1) DELETE FROM log",
+                "WITH x AS (SELECT 1) UPDATE log SET winner = 'Draw'",
+                "WITH x AS (SELECT 1) INSERT INTO log (id) SELECT * FROM x",
+                "WITH x AS (SELECT 1) REPLACE INTO log (id) SELECT * FROM x",
+                "with x as (select 1) delete from log where id in (select * from x)"):
+        results.append(check(f"Rejected: {sql}", rejects(sql)))
+    print()
+
+    print("Query files")
+    print("-" * 80)
+    for name, sql in sorted(load_query_files().items()):
+        params = {key: 1 for key in re.findall(r':([A-Za-z_][A-Za-z0-9_]*)', sql)}
+        results.append(check(f"{name} binds", binds(sql, params)))
+    print()
+
+    if all(results):
+        print("All bind checks passed")
+        return 0
+    print("Some bind checks failed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
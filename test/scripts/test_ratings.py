@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Check the Elo ratings (src/app/ratings.py) against an in-memory play log.
+
+Covers plays with no game id or no winner (skipped, as in the game_stats
+tables), the roster, background building on first use and plays recorded
+while the build is running. No API access is needed.
+"""
+
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'app'))
+
+from ratings import OVERALL, EloRatings, PlayerRatings
+
+
+class FakeClient:
+    """Answers the queries PlayerRatings makes from a list of plays."""
+
+    base_url = 'http://fake'
+
+    def __init__(self, plays, delay=0.0):
+        self.log = [dict(play, rowid=rowid) for rowid, play in enumerate(plays, 1)]
+        self.delay = threading.Event()
+        if not delay:
+            self.delay.set()
+
+    def data_version(self):
+        return len(self.log)
+
+    def run_query(self, name, params=None, fresh=False):
+        # A slow first read keeps the build running for as long as the test needs
+        self.delay.wait(5)
+        if name == 'games/latest-play':
+            return [{'rowid': len(self.log)}]
+        rows = [play for play in self.log if play['rowid'] > params['rowid']]
+        return rows[:params['limit']]
+
+
+PLAYS = [
+    {'date': '2024-01-01', 'id': 1, 'name': 'Azul', 'winner': 'Andrew'},
+    {'date': '2024-01-02', 'id': None, 'name': None, 'winner': 'Trish'},
+    {'date': '2024-01-03', 'id': 2, 'name': 'Patchwork', 'winner': None},
+    {'date': '2024-01-04', 'id': 1, 'name': 'Azul', 'winner': 'Trish'},
+    {'date': '2024-01-05', 'id': 2, 'name': 'Patchwork', 'winner': 'Draw'},
+]
+
+
+def check(label, ok):
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def main():
+    print("\n" + "="*80)
+    print("Testing Elo ratings")
+    print("="*80 + "\n")
+
+    results = []
+
+    print("Plays with no game id or winner")
+    print("-" * 80)
+    engine = EloRatings()
+    engine.players = ['Andrew', 'Trish']
+    applied = [engine.apply(dict(play, rowid=rowid)) for rowid, play in enumerate(PLAYS, 1)]
+    results.append(check("NULL id and NULL winner are skipped", applied == [True, False, False, True, True]))
+    results.append(check("Skipped plays still advance the log position", engine.last_rowid == len(PLAYS)))
+    results.append(check("No scope for a missing game id", set(engine.ratings) == {OVERALL, '1', '2'}))
+    print()
+
+    print("Building from the log")
+    print("-" * 80)
+    ratings = PlayerRatings(lambda: client, EloRatings())
+    client = FakeClient(PLAYS)
+    scored = ratings.build()
+    results.append(check(f"Built {scored} of {len(PLAYS)} plays", scored == 3))
+    results.append(check(f"Roster from the winners: {ratings.ratings.players}",
+                         ratings.ratings.players == ['Andrew', 'Trish']))
+    print()
+
+    print("Background build on first use")
+    print("-" * 80)
+    client = FakeClient(PLAYS, delay=True)
+    ratings = PlayerRatings(lambda: client, EloRatings())
+    ratings.ensure()
+    results.append(check("ensure() returns while the build runs", not ratings.ready))
+    results.append(check("The view says it is building", ratings.view()['building']))
+    # Recorded through add_game_result during the build: it is in the log, so the build scores it
+    new_play = {'date': '2024-01-06', 'id': 1, 'winner': 'Andrew', 'scores': None, 'comment': None}
+    client.log.append(dict(new_play, name='Azul', rowid=len(client.log) + 1))
+    ratings.record(new_play)
+    client.delay.set()
+    ratings.ensure(wait=5)
+    view = ratings.view()
+    results.append(check("Ready after the build", ratings.ready and not view['building']))
+    results.append(check(f"Play recorded during the build counted once ({view['plays']} plays)", view['plays'] == 4))
+    print()
+
+    if all(results):
+        print("All ratings checks passed")
+        return 0
+    print("Some ratings checks failed")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
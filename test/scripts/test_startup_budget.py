@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Startup-time regression check for the Flask (app.py) and FastHTML (main.py) apps.
+
+Fails if importing either app takes longer than its budget, or if a subsystem
+that should initialize lazily (HTTP transport, analytics) is loaded at import.
+No API access is needed: nothing is fetched at startup.
+
+Budgets (milliseconds, interpreter startup excluded) can be overridden with
+EUROGAMES_STARTUP_BUDGET_APP_MS and EUROGAMES_STARTUP_BUDGET_MAIN_MS.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'app'))
+
+from startup_profile import eager_modules, startup_ms
+
+BUDGETS_MS = {
+    'app': float(os.environ.get('EUROGAMES_STARTUP_BUDGET_APP_MS', 400)),
+    'main': float(os.environ.get('EUROGAMES_STARTUP_BUDGET_MAIN_MS', 900)),
+}
+
+
+def main():
+    print("\n" + "="*80)
+    print("Testing app startup time budgets")
+    print("="*80 + "\n")
+
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        print(f"{module}.py")
+        print("-" * 80)
+        elapsed = startup_ms(module, runs=5)
+        if elapsed <= budget:
+            print(f"✓ Import took {elapsed:.0f} ms (budget {budget:.0f} ms)")
+        else:
+            print(f"✗ Import took {elapsed:.0f} ms, over the {budget:.0f} ms budget")
+            failed = True
+
+        eager = eager_modules(module)
+        if eager:
+            print(f"✗ Loaded at import instead of on first use: {', '.join(eager)}")
+            failed = True
+        else:
+            print("✓ No lazily initialized subsystems loaded at import")
+        print()
+
+    if failed:
+        print("Run 'python src/app/startup_profile.py' for a per-module breakdown")
+        return 1
+    print("All startup budgets met")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,13 +18,12 @@ def main():
     print("WINNER STATS API RESPONSE INSPECTION")
     print("="*80 + "\n")
 
-    # Get raw response for winner stats
-    import requests
-    url = "https://eurogames.web-c10.workers.dev/v1/stats/winners"
+    # Get raw response for winner stats, through the client's transport (EUROGAMES_TRANSPORT applies)
+    url = client.base_url + "/v1/stats/winners"
     headers = client._get_auth_header()
 
     try:
-        response = requests.get(url, headers=headers)
+        response = client.transport.request('GET', url, headers=headers, timeout=client.timeout)
         data = response.json()
 
         print("GET /v1/stats/winners Response:")